@@ -0,0 +1,87 @@
+import argparse
+import csv
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+
+from keyboard_model import DATA_DIR, DEFAULT_LABELS, csv_header, mediapipe_points
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from session_env import camera_index  # noqa: E402
+
+# Records hand landmarks for each key gesture into AIKeyboard/data/<time>.csv.
+# For every label: hold the gesture, press SPACE to record, move the hand a
+# little while it records (angles, distance). N skips a label, Esc quits.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record hand-landmark samples for the gesture keyboard.")
+    parser.add_argument("--labels", nargs="+", default=DEFAULT_LABELS, help="keys to record, in order")
+    parser.add_argument("--samples", type=int, default=150, help="frames to record per key")
+    parser.add_argument("--out", default=os.path.join(DATA_DIR, time.strftime("%Y-%m-%d_%H-%M-%S") + ".csv"))
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    cap = cv2.VideoCapture(camera_index())
+    cap.set(3, 640)
+    cap.set(4, 480)
+    hands = mp.solutions.hands.Hands(max_num_hands=1, min_detection_confidence=0.7)
+    draw = mp.solutions.drawing_utils
+
+    index = 0
+    recorded = 0
+    recording = False
+
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(csv_header())
+
+        while index < len(args.labels):
+            success, frame = cap.read()
+            if not success:
+                break
+            frame = cv2.flip(frame, 1)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            results = hands.process(rgb)
+            label = args.labels[index]
+
+            if results.multi_hand_landmarks:
+                landmarks = results.multi_hand_landmarks[0]
+                draw.draw_landmarks(frame, landmarks, mp.solutions.hands.HAND_CONNECTIONS)
+                if recording:
+                    handedness = results.multi_handedness[0].classification[0].label
+                    writer.writerow([label, handedness] + [f"{v:.5f}" for v in mediapipe_points(landmarks).ravel()])
+                    recorded += 1
+                    if recorded >= args.samples:
+                        print(f"Recorded {recorded} samples for '{label}'")
+                        f.flush()
+                        index += 1
+                        recorded = 0
+                        recording = False
+
+            status = f"REC {recorded}/{args.samples}" if recording else "SPACE: record   N: skip   Esc: quit"
+            cv2.putText(frame, f"Key '{label}' ({index + 1}/{len(args.labels)})", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+            cv2.putText(frame, status, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                        (0, 0, 255) if recording else (255, 255, 255), 2)
+            cv2.imshow("Keyboard Data Collection", frame)
+
+            key = cv2.waitKey(1) & 0xFF
+            if key == 27:
+                break
+            elif key == ord(" "):
+                recording = not recording
+            elif key in (ord("n"), ord("N")) and not recording:
+                index += 1
+                recorded = 0
+
+    cap.release()
+    cv2.destroyAllWindows()
+    print("Saved to", args.out)
+
+
+if __name__ == "__main__":
+    main()
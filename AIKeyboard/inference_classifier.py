@@ -0,0 +1,120 @@
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+import pyautogui
+
+from keyboard_model import MODEL_DIR, CentroidModel, landmark_features, mediapipe_points
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from profiling import get_tracer  # noqa: E402
+from session_env import SESSION_NAME, camera_index  # noqa: E402
+
+# Gesture keyboard: each hand shape is classified into a key and typed.
+# Train a model first (collect_landmarks.py, then train_classifier.py).
+
+tracer = get_tracer("keyboard")
+
+HOLD_SECONDS = 0.4      # a gesture must be held this long before its key is typed
+REPEAT_SECONDS = 1.0    # keep holding to type it again after this long
+
+
+class KeyDebouncer:
+    """Turns per-frame predictions into key presses: one press per held gesture."""
+
+    def __init__(self, hold_seconds=HOLD_SECONDS, repeat_seconds=REPEAT_SECONDS):
+        self.hold_seconds = hold_seconds
+        self.repeat_seconds = repeat_seconds
+        self.label = None
+        self.since = 0.0
+        self.last_press = None
+
+    def update(self, label, ts):
+        if label != self.label:
+            self.label = label
+            self.since = ts
+            self.last_press = None
+            return None
+        if label is None or ts - self.since < self.hold_seconds:
+            return None
+        if self.last_press is None or ts - self.last_press >= self.repeat_seconds:
+            self.last_press = ts
+            return label
+        return None
+
+
+def main():
+    try:
+        model = CentroidModel.load(MODEL_DIR)
+    except FileNotFoundError:
+        print(f"No keyboard model in {MODEL_DIR}.")
+        print("Record gestures with AIKeyboard/collect_landmarks.py, then run AIKeyboard/train_classifier.py.")
+        sys.exit(1)
+    print(f"Loaded keyboard model: {len(model.labels)} keys, {len(model.prototypes)} prototypes")
+
+    cap = cv2.VideoCapture(camera_index())
+    cap.set(3, 640)
+    cap.set(4, 480)
+    hands = mp.solutions.hands.Hands(max_num_hands=1, model_complexity=0,
+                                     min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    debouncer = KeyDebouncer()
+    window = "Gesture Keyboard" if SESSION_NAME == "default" else f"Gesture Keyboard ({SESSION_NAME})"
+    typed = ""
+
+    while True:
+        frame_start = tracer.now()
+        with tracer.span("capture"):
+            success, frame = cap.read()
+        if not success:
+            break
+        with tracer.span("preprocess"):
+            frame = cv2.flip(frame, 1)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with tracer.span("inference"):
+            results = hands.process(rgb)
+
+        label = None
+        dist = 0.0
+        classify_start = tracer.now()
+        if results.multi_hand_landmarks:
+            handedness = results.multi_handedness[0].classification[0].label
+            features = landmark_features(mediapipe_points(results.multi_hand_landmarks[0]), handedness)
+            label, dist = model.predict(features)
+        key = debouncer.update(label, time.time())
+        tracer.record("classify", classify_start)
+        tracer.counter("hand_detected", 1 if results.multi_hand_landmarks else 0)
+
+        if key:
+            with tracer.span("inject"):
+                pyautogui.press(key)
+            if key == "backspace":
+                typed = typed[:-1]
+            elif key == "enter":
+                typed = ""
+            else:
+                typed = (typed + (" " if key == "space" else key))[-30:]
+
+        if label:
+            held = min(1.0, (time.time() - debouncer.since) / debouncer.hold_seconds)
+            cv2.putText(frame, f"{label}  (d={dist:.1f})", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0,
+                        (0, 255, 0) if held >= 1.0 else (0, 200, 255), 2)
+            cv2.rectangle(frame, (10, 55), (10 + int(200 * held), 65), (0, 255, 0), -1)
+        elif results.multi_hand_landmarks:
+            cv2.putText(frame, "No key", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 2)
+        cv2.putText(frame, typed, (10, 460), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+        with tracer.span("render"):
+            cv2.imshow(window, frame)
+            k = cv2.waitKey(1) & 0xFF
+        tracer.record("frame", frame_start)
+        if k == 27:
+            break
+
+    cap.release()
+    cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
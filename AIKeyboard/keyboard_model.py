@@ -0,0 +1,172 @@
+"""
+Hand-landmark features and a NumPy-only key classifier for the gesture keyboard.
+
+The model is nearest-prototype: every key has a few centroids (k-means
+inside the class) in standardized feature space, and a frame is assigned
+to the closest one. Prediction is one small matrix-vector product, so it
+costs a few microseconds next to the ~10 ms MediaPipe takes per frame.
+
+Recorded sessions are CSV files with one row per frame:
+    label,handedness,x0,y0,z0,...,x20,y20,z20
+Raw landmarks are stored rather than features, so changing the features
+only needs a retrain, not new recordings.
+"""
+import csv
+import glob
+import os
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+MODEL_DIR = os.path.join(BASE_DIR, "model")
+
+NUM_LANDMARKS = 21
+WRIST = 0
+MIDDLE_MCP = 9
+FINGERTIPS = [4, 8, 12, 16, 20]
+_TIP_PAIRS = np.triu_indices(len(FINGERTIPS), k=1)
+
+# Keys a gesture can stand for; names are what pyautogui.press() expects
+DEFAULT_LABELS = [chr(c) for c in range(ord("a"), ord("z") + 1)] + ["space", "backspace", "enter"]
+
+
+# -------------------- Features --------------------
+def landmark_features(points, handedness="Right"):
+    """
+    (21, 3) landmarks in image-normalized coordinates -> 1-D float32 features.
+
+    Translation-invariant (relative to the wrist), scale-invariant (divided
+    by palm length) and mirrored for left hands so one model serves both.
+    Fingertip-to-fingertip distances are appended because several keys
+    differ only by which fingers touch.
+    """
+    pts = np.asarray(points, dtype=np.float32).reshape(NUM_LANDMARKS, 3)
+    pts = pts - pts[WRIST]
+    if handedness == "Left":
+        pts[:, 0] = -pts[:, 0]
+    scale = float(np.linalg.norm(pts[MIDDLE_MCP, :2]))
+    if scale < 1e-6:
+        scale = float(np.abs(pts).max()) or 1.0
+    pts /= scale
+
+    tips = pts[FINGERTIPS]
+    diff = tips[:, None, :] - tips[None, :, :]
+    tip_dist = np.sqrt((diff * diff).sum(-1))[_TIP_PAIRS]
+    return np.concatenate([pts[1:].ravel(), tip_dist]).astype(np.float32)
+
+
+def mediapipe_points(hand_landmarks):
+    """MediaPipe NormalizedLandmarkList -> (21, 3) array."""
+    return np.array([(p.x, p.y, p.z) for p in hand_landmarks.landmark], dtype=np.float32)
+
+
+# -------------------- Recorded sessions --------------------
+def csv_header():
+    return ["label", "handedness"] + [f"{a}{i}" for i in range(NUM_LANDMARKS) for a in "xyz"]
+
+
+def load_sessions(paths=None):
+    """Read recorded CSVs (default: every file in DATA_DIR) -> (points (N, 21, 3), handedness, labels)."""
+    if paths is None:
+        paths = sorted(glob.glob(os.path.join(DATA_DIR, "*.csv")))
+    points, hands, labels = [], [], []
+    for path in paths:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                labels.append(row["label"])
+                hands.append(row.get("handedness") or "Right")
+                points.append([float(row[f"{a}{i}"]) for i in range(NUM_LANDMARKS) for a in "xyz"])
+    points = np.array(points, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+    return points, hands, labels
+
+
+def features_matrix(points, hands):
+    if len(points) == 0:
+        return np.zeros((0, len(landmark_features(np.zeros((NUM_LANDMARKS, 3))))), dtype=np.float32)
+    return np.stack([landmark_features(p, h) for p, h in zip(points, hands)])
+
+
+# -------------------- Model --------------------
+def _kmeans(X, k, rng, iterations=20):
+    centers = X[rng.choice(len(X), size=k, replace=False)]
+    for _ in range(iterations):
+        d = ((X[:, None, :] - centers[None, :, :]) ** 2).sum(-1)
+        assign = d.argmin(1)
+        new = np.array([X[assign == j].mean(0) if np.any(assign == j) else centers[j] for j in range(k)])
+        if np.allclose(new, centers):
+            break
+        centers = new
+    return centers
+
+
+class CentroidModel:
+    def __init__(self, labels, prototypes, proto_labels, mean, scale, reject_distance):
+        self.labels = list(labels)
+        self.prototypes = np.asarray(prototypes, dtype=np.float32)
+        self.proto_labels = np.asarray(proto_labels, dtype=np.int32)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.reject_distance = float(reject_distance)
+        # ||p||^2 once, so a query is dist^2 = ||x||^2 - 2 P.x + ||p||^2
+        self._proto_sq = (self.prototypes ** 2).sum(1)
+
+    @classmethod
+    def fit(cls, X, y, per_class=4, reject_quantile=0.99, seed=0):
+        """X: (N, F) features, y: N label strings."""
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        labels = sorted(set(y.tolist()))
+        mean = X.mean(0)
+        scale = X.std(0)
+        scale[scale < 1e-6] = 1.0
+        Z = (X - mean) / scale
+
+        rng = np.random.default_rng(seed)
+        protos, proto_labels = [], []
+        for i, label in enumerate(labels):
+            Zc = Z[y == label]
+            k = max(1, min(per_class, len(Zc) // 5))
+            centers = Zc.mean(0, keepdims=True) if k == 1 else _kmeans(Zc, k, rng)
+            protos.append(centers)
+            proto_labels.extend([i] * len(centers))
+
+        model = cls(labels, np.concatenate(protos), proto_labels, mean, scale, np.inf)
+        # Reject frames farther from every prototype than nearly all training frames were
+        _, dist = model.predict_batch(X)
+        model.reject_distance = float(np.quantile(dist, reject_quantile)) * 1.2
+        return model
+
+    def predict_batch(self, X):
+        """(N, F) features -> (label indices, distances to the nearest prototype)."""
+        Z = (np.asarray(X, dtype=np.float32) - self.mean) / self.scale
+        d2 = (Z ** 2).sum(1)[:, None] - 2.0 * Z @ self.prototypes.T + self._proto_sq[None, :]
+        nearest = d2.argmin(1)
+        dist = np.sqrt(np.maximum(d2[np.arange(len(Z)), nearest], 0.0))
+        return self.proto_labels[nearest], dist
+
+    def predict(self, features):
+        """One feature vector -> (label, distance); label is None when the hand matches no key."""
+        z = (features - self.mean) / self.scale
+        d2 = self._proto_sq - 2.0 * (self.prototypes @ z)
+        j = int(d2.argmin())
+        dist = float(np.sqrt(max(float(d2[j] + z @ z), 0.0)))
+        if dist > self.reject_distance:
+            return None, dist
+        return self.labels[self.proto_labels[j]], dist
+
+    def save(self, model_dir=MODEL_DIR):
+        os.makedirs(model_dir, exist_ok=True)
+        np.save(os.path.join(model_dir, "labels.npy"), np.array(self.labels))
+        np.save(os.path.join(model_dir, "prototypes.npy"), self.prototypes)
+        np.save(os.path.join(model_dir, "proto_labels.npy"), self.proto_labels)
+        np.save(os.path.join(model_dir, "mean.npy"), self.mean)
+        np.save(os.path.join(model_dir, "scale.npy"), self.scale)
+        np.save(os.path.join(model_dir, "reject_distance.npy"), np.array(self.reject_distance))
+
+    @classmethod
+    def load(cls, model_dir=MODEL_DIR):
+        def arr(name):
+            return np.load(os.path.join(model_dir, name + ".npy"), allow_pickle=False)
+        return cls(arr("labels").tolist(), arr("prototypes"), arr("proto_labels"),
+                   arr("mean"), arr("scale"), arr("reject_distance"))
@@ -0,0 +1,76 @@
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from keyboard_model import MODEL_DIR, CentroidModel, features_matrix, load_sessions
+
+# Builds the gesture-keyboard model from sessions recorded with collect_landmarks.py.
+#   python AIKeyboard/train_classifier.py                 # every CSV in AIKeyboard/data
+#   python AIKeyboard/train_classifier.py a.csv b.csv --per-class 6
+
+
+def split(labels, test_fraction, rng):
+    """Stratified train/test split: the same share of every key goes to the test set."""
+    labels = np.asarray(labels)
+    test = np.zeros(len(labels), dtype=bool)
+    for label in set(labels.tolist()):
+        idx = np.flatnonzero(labels == label)
+        rng.shuffle(idx)
+        test[idx[:int(len(idx) * test_fraction)]] = True
+    return ~test, test
+
+
+def evaluate(model, X, y):
+    pred, _ = model.predict_batch(X)
+    pred = np.array([model.labels[i] for i in pred])
+    y = np.asarray(y)
+    confusions = Counter((t, p) for t, p in zip(y, pred) if t != p)
+    return float((pred == y).mean()), confusions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the gesture-keyboard model.")
+    parser.add_argument("sessions", nargs="*", help="recorded CSV files (default: AIKeyboard/data/*.csv)")
+    parser.add_argument("--per-class", type=int, default=4, help="prototypes per key")
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--out", default=MODEL_DIR)
+    args = parser.parse_args()
+
+    points, hands, labels = load_sessions(args.sessions or None)
+    if not labels:
+        print("No recorded samples found. Record some with: python AIKeyboard/collect_landmarks.py")
+        return
+    X = features_matrix(points, hands)
+    counts = Counter(labels)
+    print(f"{len(labels)} samples, {len(counts)} keys "
+          f"(fewest: {min(counts.values())} for '{min(counts, key=counts.get)}')")
+
+    rng = np.random.default_rng(0)
+    train, test = split(labels, args.test_fraction, rng)
+    y = np.asarray(labels)
+    if test.any():
+        model = CentroidModel.fit(X[train], y[train], per_class=args.per_class)
+        acc, confusions = evaluate(model, X[test], y[test])
+        print(f"Held-out accuracy: {acc:.1%} on {int(test.sum())} samples")
+        for (true, pred), n in confusions.most_common(5):
+            print(f"  '{true}' read as '{pred}': {n}")
+
+    # Final model uses every sample
+    t0 = time.perf_counter()
+    model = CentroidModel.fit(X, y, per_class=args.per_class)
+    print(f"Trained {len(model.prototypes)} prototypes in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    sample = X[0]
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        model.predict(sample)
+    print(f"Prediction: {(time.perf_counter() - t0) * 1000:.1f} us per frame")
+
+    model.save(args.out)
+    print("Saved model to", args.out)
+
+
+if __name__ == "__main__":
+    main()
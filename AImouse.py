@@ -5,13 +5,19 @@ import numpy as np
 import threading
 import time
 import pyautogui  # for screen size
+from profiling import get_tracer
+from session_env import camera_index, display_region
 
-# Detect screen resolution dynamically
+# Per-stage timings; enabled with VCH_TRACE (see profiling.py)
+tracer = get_tracer("AImouse")
+
+# Detect screen resolution dynamically; a controller session may confine us to part of it
 screen_w, screen_h = pyautogui.size()
+region_x, region_y, region_w, region_h = display_region(screen_w, screen_h)
 
 # Initialize camera
 hands = HandDetector(detectionCon=0.8, maxHands=1)
-cap = cv2.VideoCapture(0)
+cap = cv2.VideoCapture(camera_index())
 cam_w, cam_h = 640, 480
 cap.set(3, cam_w)
 cap.set(4, cam_h)
@@ -49,16 +55,20 @@ l_clk_thread = threading.Thread(target=l_clk_delay)
 r_clk_thread = threading.Thread(target=r_clk_delay)
 double_clk_thread = threading.Thread(target=double_clk_delay)
 
-prev_x, prev_y = 0, 0
+prev_x, prev_y = region_x, region_y
 smoothening = 5
 
 while True:
-    success, frame = cap.read()
-    frame = cv2.flip(frame, 1)
-    detector, frame = hands.findHands(frame, flipType=False)
+    frame_start = tracer.now()
+    with tracer.span("capture"):
+        success, frame = cap.read()
+        frame = cv2.flip(frame, 1)
+    with tracer.span("inference"):
+        detector, frame = hands.findHands(frame, flipType=False)
 
     cv2.rectangle(frame, (frameR, frameR), (cam_w - frameR, cam_h - frameR), (255, 0, 255), 2)
 
+    classify_start = tracer.now()
     if detector:
         lmlist = detector[0]['lmList']
         ind_x, ind_y = lmlist[8][0], lmlist[8][1]
@@ -69,39 +79,45 @@ while True:
 
         # mouse movement
         if fingers[1] == 1 and fingers[2] == 0 and fingers[0] == 1:
-            curr_x = int(np.interp(ind_x, (frameR, cam_w - frameR), (0, screen_w)))
-            curr_y = int(np.interp(ind_y, (frameR, cam_h - frameR), (0, screen_h)))
+            curr_x = int(np.interp(ind_x, (frameR, cam_w - frameR), (region_x, region_x + region_w)))
+            curr_y = int(np.interp(ind_y, (frameR, cam_h - frameR), (region_y, region_y + region_h)))
 
             final_x = prev_x + (curr_x - prev_x) / smoothening
             final_y = prev_y + (curr_y - prev_y) / smoothening
 
-            mouse.move(int(final_x), int(final_y))
+            with tracer.span("inject"):
+                mouse.move(int(final_x), int(final_y))
             prev_x, prev_y = final_x, final_y
 
         # Mouse Button Clicks
         if fingers[1] == 1 and fingers[2] == 1 and fingers[0] == 1:
             if abs(ind_x - mid_x) < 25:
                 if fingers[4] == 0 and l_delay == 0:
-                    mouse.click(button="left")
+                    with tracer.span("inject"):
+                        mouse.click(button="left")
                     l_delay = 1
                     l_clk_thread.start()
 
                 if fingers[4] == 1 and r_delay == 0:
-                    mouse.click(button="right")
+                    with tracer.span("inject"):
+                        mouse.click(button="right")
                     r_delay = 1
                     r_clk_thread.start()
 
         # Mouse Scrolling
         if fingers[1] == 1 and fingers[2] == 1 and fingers[0] == 0 and fingers[4] == 0:
             if abs(ind_x - mid_x) < 25:
-                mouse.wheel(delta=-1)
+                with tracer.span("inject"):
+                    mouse.wheel(delta=-1)
         if fingers[1] == 1 and fingers[2] == 1 and fingers[0] == 0 and fingers[4] == 1:
             if abs(ind_x - mid_x) < 25:
-                mouse.wheel(delta=1)
+                with tracer.span("inject"):
+                    mouse.wheel(delta=1)
 
         # Double Mouse Click
         if fingers[1] == 1 and fingers[2] == 0 and fingers[0] == 0 and fingers[4] == 0:
-            mouse.double_click(button="left")
+            with tracer.span("inject"):
+                mouse.double_click(button="left")
 
         # Screenshot feature
         if fingers == [0, 0, 0, 0, 0]:
@@ -110,9 +126,14 @@ while True:
             cv2.putText(frame, "Screenshot Taken", (200, 50),
                         cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
             time.sleep(1)
-
-    cv2.imshow("Camera Feed", frame)
-    if cv2.waitKey(1) & 0xFF == 27:
+    tracer.record("classify", classify_start)
+    tracer.counter("hand_detected", 1 if detector else 0)
+
+    with tracer.span("render"):
+        cv2.imshow("Camera Feed", frame)
+        key = cv2.waitKey(1) & 0xFF
+    tracer.record("frame", frame_start)
+    if key == 27:
         break
 
 cap.release()
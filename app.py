@@ -1,10 +1,11 @@
 from flask import (
-    Flask, request, jsonify, send_from_directory,
+    Flask, request, jsonify,
     session
 )
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 import subprocess
 import threading
 import os
@@ -12,20 +13,73 @@ import datetime
 import json
 import time
 import sys  # <-- added
-from chatbox import generate_chat_reply
+import atexit
+import sqlite3
+import re
+import signal
+from chatbox import generate_chat_reply, reply_context_fingerprint
+from write_behind import WriteBehindQueue
+from assets import AssetStore
+from reply_cache import ReplyCache
+from password_hashing import PasswordHasher, HashingBusy
+from session_env import parse_region
 
 # ---- Paths & command file shared with control_service.py ----
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-COMMAND_FILE = os.path.join(BASE_DIR, "control_command.json")
+COMMAND_FILE = os.getenv("CONTROL_COMMAND_FILE", os.path.join(BASE_DIR, "control_command.json"))
+COMMAND_DIR = os.getenv("CONTROL_COMMAND_DIR", os.path.join(BASE_DIR, "control_commands"))
+STATUS_FILE = os.getenv("CONTROL_STATUS_FILE", os.path.join(BASE_DIR, "control_status.json"))
+CONTROLLER_SCRIPT = os.getenv("CONTROL_SERVICE_SCRIPT", os.path.join(BASE_DIR, "control_service.py"))
 
-app = Flask(__name__, static_folder='Frontend', static_url_path='')
+FRONTEND_DIR = os.path.join(BASE_DIR, "Frontend")
+MODEL_DIR = os.path.join(BASE_DIR, "3d_model")
+ASSET_CACHE_DIR = os.path.join(BASE_DIR, ".asset_cache")
+
+# Static files go through AssetStore (see frontend_file below) instead of Flask's static route
+app = Flask(__name__, static_folder=None)
 
 app.config['SECRET_KEY'] = 'change-this-to-a-strong-secret'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL", 'sqlite:///app.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = datetime.timedelta(days=7)
+# Authenticated routes only read the signed cookie; don't re-sign and resend it on every response
+app.config['SESSION_REFRESH_EACH_REQUEST'] = False
+# Wait for a busy database instead of failing straight away with "database is locked"
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {"connect_args": {"timeout": 15}}
+
+# Chat messages are written in batches from a background thread
+app.config['CHAT_WRITE_BATCH_SIZE'] = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "50"))
+app.config['CHAT_WRITE_FLUSH_INTERVAL'] = float(os.getenv("CHAT_WRITE_FLUSH_INTERVAL", "0.2"))
+
+# Optional cache for repeated chat questions (scope: "global" or "user")
+app.config['CHAT_CACHE_ENABLED'] = os.getenv("CHAT_CACHE_ENABLED", "0") == "1"
+app.config['CHAT_CACHE_SCOPE'] = os.getenv("CHAT_CACHE_SCOPE", "global")
+app.config['CHAT_CACHE_TTL'] = int(os.getenv("CHAT_CACHE_TTL", "3600"))
+app.config['CHAT_CACHE_MAX_ENTRIES'] = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "1000"))
 
 db = SQLAlchemy(app)
+
+# Password hashing runs on a process pool (see password_hashing.py for the PASSWORD_HASH_* settings)
+password_hasher = PasswordHasher()
+
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers (history, login) run while a writer holds the lock,
+    and synchronous=NORMAL is still crash-safe in WAL mode.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=15000")
+    cursor.execute("PRAGMA cache_size=-16000")  # ~16 MB page cache
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 CORS(app, supports_credentials=True)
 
 # ---- Controller process (control_service.py) ----
@@ -35,6 +89,7 @@ controller_started = False
 @app.before_request
 def start_controller_once():
     global controller_started
+    init_app()  # no-op once done; covers servers that import app without calling it
     if not controller_started:
         start_controller()
         controller_started = True
@@ -50,11 +105,9 @@ def start_controller():
     if controller_proc is not None and controller_proc.poll() is None:
         return
 
-    controller_script = os.path.join(BASE_DIR, "control_service.py")
-
     try:
         controller_proc = subprocess.Popen(
-            [sys.executable, controller_script]
+            [sys.executable, CONTROLLER_SCRIPT]
         )
         print("Control service started with PID:", controller_proc.pid)
     except Exception as e:
@@ -67,10 +120,10 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
 
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
 
 class ChatMessage(db.Model):
@@ -83,59 +136,238 @@ class ChatMessage(db.Model):
     user = db.relationship('User', backref=db.backref('messages', lazy=True))
 
 
-with app.app_context():
-    db.create_all()
+# ---- Static and 3D-model assets (precompressed, ETag, range support) ----
+frontend_assets = AssetStore(FRONTEND_DIR, os.path.join(ASSET_CACHE_DIR, "frontend"))
+model_assets = AssetStore(MODEL_DIR, os.path.join(ASSET_CACHE_DIR, "3d_model"))
+
+
+# ---- Reply cache for repeated chat questions ----
+reply_cache = ReplyCache(
+    enabled=app.config['CHAT_CACHE_ENABLED'],
+    scope=app.config['CHAT_CACHE_SCOPE'],
+    ttl=app.config['CHAT_CACHE_TTL'],
+    max_entries=app.config['CHAT_CACHE_MAX_ENTRIES'],
+)
+
+
+# ---- Write-behind persistence for chat messages ----
+def persist_chat_batch(rows):
+    """Insert a batch of queued chat messages in a single transaction."""
+    with app.app_context():
+        try:
+            db.session.add_all([ChatMessage(**row) for row in rows])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            db.session.remove()
+
+
+chat_writer = None  # WriteBehindQueue, started by init_app()
+
+
+def pending_chat_rows(user_id):
+    return chat_writer.pending(lambda row: row["user_id"] == user_id)
+
+
+def exit_on_sigterm(signum, frame):
+    # Turn SIGTERM into a normal interpreter exit so the atexit hooks still run:
+    # chat_writer.close drains queued messages, the hashing pool shuts down
+    raise SystemExit(0)
+
+
+# ---- Start-up ----
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def init_app():
+    """
+    Create tables, index static assets, start the chat writer and hook shutdown.
+    Kept out of module level: on Windows the password-hashing workers are spawned
+    and re-import the main module, so `python app.py` would redo all of this in
+    every worker.
+    """
+    global chat_writer, _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        with app.app_context():
+            db.create_all()
+        frontend_assets.build()
+        model_assets.build()
+
+        chat_writer = WriteBehindQueue(
+            persist_chat_batch,
+            batch_size=app.config['CHAT_WRITE_BATCH_SIZE'],
+            flush_interval=app.config['CHAT_WRITE_FLUSH_INTERVAL'],
+            name="chat-writer",
+        )
+        # atexit runs these last-registered first: drain chat, then stop the pool
+        atexit.register(password_hasher.shutdown)
+        atexit.register(chat_writer.close)
+        # signal handlers can only be installed from the main thread
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, exit_on_sigterm)
+        _initialized = True
 
 
 @app.route("/")
 def home():
     if "user_id" not in session:
-        return app.send_static_file("login.html")
-    return app.send_static_file("index.html")
+        return frontend_assets.serve("login.html")
+    return frontend_assets.serve("index.html")
 
 
-@app.route("/run", methods=["POST"])
-def run_mode():
-    # ensure controller is running (extra safety)
-    start_controller()
+@app.route("/<path:filename>")
+def frontend_file(filename):
+    return frontend_assets.serve(filename)
 
-    data = request.get_json() or {}
-    script = data.get("script", "").lower()
 
-    # Map old script names / labels to logical modes
-    if "aimouse" in script or "handgesture" in script or "hand" in script:
-        mode = "hand"
+RUN_MODES = ("hand", "eye", "voice", "keyboard", "fused")
+SESSION_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+
+def mode_from_script(script):
+    """Map old script names / labels to logical modes ("none" = stop)."""
+    script = (script or "").lower()
+    if "fused" in script:
+        return "fused"
+    elif "aimouse" in script or "handgesture" in script or "hand" in script:
+        return "hand"
     elif "eye" in script:
-        mode = "eye"
+        return "eye"
     elif "voice" in script:
-        mode = "voice"
+        return "voice"
     elif "keyboard" in script:
-        mode = "keyboard"
+        return "keyboard"
     elif "stop" in script:
-        mode = "none"
+        return "none"
+    return None
+
+
+def queue_command(cmd):
+    """
+    Hand a command to control_service.py. Each command is its own file,
+    written under a temporary name and renamed when complete, so
+    concurrent requests can't overwrite each other.
+    """
+    cmd["time"] = time.time()
+    os.makedirs(COMMAND_DIR, exist_ok=True)
+    name = f"{time.time_ns():020d}-{os.getpid()}-{threading.get_ident()}"
+    tmp = os.path.join(COMMAND_DIR, name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cmd, f)
+    os.replace(tmp, os.path.join(COMMAND_DIR, name + ".json"))
+
+
+def parse_start_request(data):
+    """Validate a session start request. Returns (command, error message)."""
+    session_name = data.get("session") or "default"
+    if not SESSION_NAME_RE.match(str(session_name)):
+        return None, "session must be 1-32 letters, digits, '-' or '_'"
+
+    mode = data.get("mode") or mode_from_script(data.get("script"))
+    if mode not in RUN_MODES:
+        return None, f"mode must be one of: {', '.join(RUN_MODES)}"
+    cmd = {"action": "start", "session": session_name, "mode": mode}
+
+    camera = data.get("camera")
+    if camera is not None:
+        if isinstance(camera, bool) or not isinstance(camera, int) or camera < 0:
+            return None, "camera must be a non-negative integer"
+        cmd["camera"] = camera
+
+    region = data.get("region")
+    if region is not None:
+        if isinstance(region, dict):
+            region = [region.get(k) for k in ("x", "y", "w", "h")]
+        region = parse_region(region)
+        if region is None:
+            return None, "region must be [x, y, w, h] with w, h > 0"
+        cmd["region"] = list(region)
+
+    cores = data.get("cores")
+    if cores is not None:
+        if (not isinstance(cores, list) or not cores
+                or not all(isinstance(c, int) and not isinstance(c, bool) and c >= 0 for c in cores)):
+            return None, "cores must be a non-empty list of core numbers"
+        cmd["cores"] = sorted(set(cores))
+    return cmd, None
+
+
+def read_controller_status():
+    try:
+        with open(STATUS_FILE, "r", encoding="utf-8") as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return {"controller": "starting", "sessions": {}}
+    # The controller rewrites the file every second while it's alive
+    status["controller"] = "running" if time.time() - status.get("updated", 0) < 5 else "stale"
+    return status
+
+
+@app.route("/run", methods=["POST"])
+def run_mode():
+    # ensure controller is running (extra safety)
+    start_controller()
+
+    data = request.get_json() or {}
+    action = data.get("action")
+
+    if action is None:
+        # Original contract: {"script": ...} switches the single "default" session
+        script = data.get("script", "")
+        mode = mode_from_script(script)
+        if mode is None:
+            return jsonify({"error": f"Unknown mode for script: {script}"}), 400
+        if mode == "none":
+            cmd = {"action": "stop"}
+            msg = "All control modes stopped."
+        else:
+            cmd = {"action": "start", "session": "default", "mode": mode}
+            msg = f"{mode.upper()} mode requested. Previous mode will stop automatically."
+    elif action == "status":
+        return run_status()
+    elif action == "start":
+        cmd, error = parse_start_request(data)
+        if error:
+            return jsonify({"error": error}), 400
+        msg = f"{cmd['mode'].upper()} mode requested for session {cmd['session']}."
+    elif action == "stop":
+        session_name = data.get("session")
+        if session_name and not SESSION_NAME_RE.match(str(session_name)):
+            return jsonify({"error": "Invalid session name"}), 400
+        cmd = {"action": "stop", "session": session_name} if session_name else {"action": "stop"}
+        msg = f"Session {session_name} stopped." if session_name else "All control modes stopped."
     else:
-        return jsonify({"error": f"Unknown mode for script: {script}"}), 400
+        return jsonify({"error": f"Unknown action: {action}"}), 400
 
-    # Write desired mode into command file
-    cmd = {"mode": mode, "time": time.time()}
     try:
-        with open(COMMAND_FILE, "w", encoding="utf-8") as f:
-            json.dump(cmd, f)
+        queue_command(cmd)
     except Exception as e:
         print("Error writing command file:", e)
         return jsonify({"error": "Failed to send command to controller"}), 500
 
-    if mode == "none":
-        msg = "All control modes stopped."
-    else:
-        msg = f"{mode.upper()} mode requested. Previous mode will stop automatically."
+    return jsonify({"message": msg, "session": cmd.get("session")})
+
 
-    return jsonify({"message": msg})
+@app.route("/run/status", methods=["GET"])
+def run_status():
+    status = read_controller_status()
+    session_name = request.args.get("session") or (request.get_json(silent=True) or {}).get("session")
+    if session_name:
+        session_status = status.get("sessions", {}).get(session_name)
+        if session_status is None:
+            return jsonify({"error": f"No session named {session_name}"}), 404
+        return jsonify({"controller": status["controller"], "session": session_status})
+    return jsonify(status)
 
 
 @app.route('/3d_model/<path:filename>')
 def serve_3d_model(filename):
-    return send_from_directory('3d_model', filename)
+    return model_assets.serve(filename)
 
 
 @app.route('/api/register', methods=['POST'])
@@ -147,12 +379,17 @@ def register():
     if not username or not password:
         return jsonify({"error": "Username and password required."}), 400
 
-    if User.query.filter_by(username=username).first():
+    exists = User.query.filter_by(username=username).first() is not None
+    # Give the pooled DB connection back before waiting on the hashing pool (see login)
+    db.session.close()
+    if exists:
         return jsonify({"error": "Username already exists."}), 400
 
-    user = User(username=username)
-    user.set_password(password)
-    db.session.add(user)
+    try:
+        pwhash = password_hasher.hash(password)
+    except HashingBusy as e:
+        return jsonify({"error": f"Server busy, please retry. ({e})"}), 503
+    db.session.add(User(username=username, password_hash=pwhash))
     db.session.commit()
     return jsonify({"message": "User registered successfully."})
 
@@ -164,14 +401,32 @@ def login():
     password = (data.get('password') or '').strip()
 
     user = User.query.filter_by(username=username).first()
-    if not user or not user.check_password(password):
+    user_id, pwhash = (user.id, user.password_hash) if user else (None, None)
+    # Give the pooled DB connection back while the hashing pool works; during a login
+    # storm the waiting requests would otherwise hold every connection and stall
+    # unrelated endpoints such as /api/chat/history
+    db.session.close()
+    try:
+        valid = pwhash is not None and password_hasher.verify(pwhash, password)
+    except HashingBusy as e:
+        return jsonify({"error": f"Server busy, please retry. ({e})"}), 503
+    if not valid:
         return jsonify({"error": "Invalid username or password."}), 401
 
-    session['user_id'] = user.id
-    session['username'] = user.username
+    # Upgrade hashes made with an older method or work factor while we have the password
+    try:
+        if password_hasher.needs_rehash(pwhash):
+            new_hash = password_hasher.hash(password)
+            User.query.filter_by(id=user_id).update({"password_hash": new_hash})
+            db.session.commit()
+    except HashingBusy:
+        pass  # keep the old hash, try again on the next login
+
+    session['user_id'] = user_id
+    session['username'] = username
     session.permanent = True 
     
-    return jsonify({"message": "Logged in successfully.", "username": user.username})
+    return jsonify({"message": "Logged in successfully.", "username": username})
 
 
 @app.route('/api/logout', methods=['POST'])
@@ -202,37 +457,60 @@ def chat():
 
     user_id = session['user_id']
 
+    # Messages still waiting in the write-behind queue are newer than anything in the DB.
+    # Take them before the query: one committed in between comes back from both, and is
+    # recognized by its created_at
+    pending = pending_chat_rows(user_id)
     last_msgs = ChatMessage.query.filter_by(user_id=user_id) \
         .order_by(ChatMessage.created_at.desc()) \
         .limit(10).all()
+    stored = {m.created_at for m in last_msgs}
+    turns = [(m.user_message, m.bot_reply) for m in reversed(last_msgs)]
+    turns += [(row["user_message"], row["bot_reply"]) for row in pending if row["created_at"] not in stored]
     history = []
-    for m in reversed(last_msgs):
-        history.append({"role": "user", "content": m.user_message})
-        history.append({"role": "assistant", "content": m.bot_reply})
+    for user_text, bot_text in turns[-10:]:
+        history.append({"role": "user", "content": user_text})
+        history.append({"role": "assistant", "content": bot_text})
 
     try:
-        reply = generate_chat_reply(user_message, history=history)
+        reply = reply_cache.get_or_generate(
+            user_message,
+            history,
+            lambda: generate_chat_reply(user_message, history=history),
+            user_id=user_id,
+            context=reply_context_fingerprint(),
+        )
     except Exception as e:
         print("Chat error:", e)
         return jsonify({"error": f"AI error: {e}"}), 500
 
-    chat_msg = ChatMessage(
-        user_id=user_id,
-        user_message=user_message,
-        bot_reply=reply,
-    )
-    db.session.add(chat_msg)
-    db.session.commit()
+    chat_writer.put({
+        "user_id": user_id,
+        "user_message": user_message,
+        "bot_reply": reply,
+        "created_at": datetime.datetime.utcnow(),
+    })
 
     return jsonify({"reply": reply})
 
 
+@app.route('/api/chat/cache', methods=['GET'])
+def chat_cache_stats():
+    if 'user_id' not in session:
+        return jsonify({"error": "Not authenticated."}), 401
+    return jsonify(reply_cache.stats())
+
+
 @app.route('/api/chat/history', methods=['GET'])
 def chat_history():
     if 'user_id' not in session:
         return jsonify({"error": "Not authenticated."}), 401
 
     user_id = session['user_id']
+    # Make sure this user's queued messages are in the DB so they get real ids
+    if pending_chat_rows(user_id):
+        chat_writer.flush(timeout=5)
+
     msgs = ChatMessage.query.filter_by(user_id=user_id) \
         .order_by(ChatMessage.created_at.asc()) \
         .all()
@@ -249,4 +527,5 @@ def chat_history():
 
 
 if __name__ == "__main__":
+    init_app()
     app.run(debug=True)
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+
+# Start Menu folders scanned on Windows; override with `roots=` for tests/benchmarks
+DEFAULT_ROOTS = [
+    r"C:\ProgramData\Microsoft\Windows\Start Menu\Programs",
+    os.path.join(os.environ.get("APPDATA", ""), r"Microsoft\Windows\Start Menu\Programs"),
+]
+DEFAULT_CATALOG_FILE = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "VirtualControlHub", "app_catalog.json"
+)
+CATALOG_VERSION = 1
+
+
+class AppCatalog:
+    """
+    On-disk index of launchable apps (name -> shortcut path or AppsFolder id).
+
+    The last saved index is loaded instantly at start-up. Refreshes run in a
+    background thread and only re-list directories whose mtime changed, then
+    swap the new index in with a single assignment so readers never see a
+    half-built dict.
+    """
+
+    def __init__(self, roots=None, cache_file=DEFAULT_CATALOG_FILE, extensions=(".lnk",),
+                 extra_sources=None, refresh_interval=600):
+        self.roots = [os.path.abspath(r) for r in (roots or DEFAULT_ROOTS) if r]
+        self.cache_file = cache_file
+        self.extensions = tuple(e.lower() for e in extensions)
+        # Callables returning {name: path} that can't be scanned incrementally (e.g. shell:AppsFolder)
+        self.extra_sources = list(extra_sources or [])
+        self.refresh_interval = refresh_interval
+        # Called with the new mapping after every swap, e.g. to rebuild a search index
+        self.on_update = []
+
+        self.version = 0
+        self._apps = {}
+        self._dirs = {}    # dir -> {"mtime": float, "subdirs": [...], "files": {name: path}}
+        self._extra = {}
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.last_refresh = 0.0
+        self.last_scan_stats = {}
+
+    # -------------------- Reading --------------------
+    def apps(self):
+        """Current name -> path mapping. Treat it as read-only; it is replaced, not mutated."""
+        return self._apps
+
+    def load(self):
+        """Load the saved catalog. Returns False if there is none or it doesn't match our roots."""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != CATALOG_VERSION or data.get("roots") != self.roots:
+            return False
+
+        self._dirs = data.get("dirs", {})
+        self._extra = data.get("extra", {})
+        self.last_refresh = data.get("saved_at", 0.0)
+        self._publish()
+        return True
+
+    # -------------------- Refreshing --------------------
+    def refresh(self):
+        """Rescan changed directories and extra sources, then swap in and save the new index."""
+        with self._refresh_lock:
+            t0 = time.perf_counter()
+            dirs, listed, reused = {}, 0, 0
+            for root in self.roots:
+                l, r = self._scan(root, dirs)
+                listed += l
+                reused += r
+
+            extra, failed = {}, False
+            for source in self.extra_sources:
+                try:
+                    extra.update(source())
+                except Exception as e:
+                    print(f"App source {getattr(source, '__name__', source)} failed:", e)
+                    failed = True
+            if failed:
+                # Keep what the failing source found last time instead of dropping its apps
+                extra = {**self._extra, **extra}
+
+            changed = listed > 0 or extra != self._extra or dirs.keys() != self._dirs.keys()
+            self._dirs = dirs
+            self._extra = extra
+            self.last_refresh = time.time()
+            if changed or not self.version:
+                self._publish()
+                self._save()
+            self.last_scan_stats = {
+                "dirs_listed": listed,
+                "dirs_reused": reused,
+                "changed": changed,
+                "apps": len(self._apps),
+                "seconds": time.perf_counter() - t0,
+            }
+            return self._apps
+
+    def refresh_async(self):
+        threading.Thread(target=self.refresh, name="app-catalog-refresh", daemon=True).start()
+
+    def start(self):
+        """Load the saved index, then keep it fresh from a background thread."""
+        loaded = self.load()
+        self._thread = threading.Thread(target=self._run, args=(not loaded,),
+                                        name="app-catalog", daemon=True)
+        self._thread.start()
+        if not loaded:
+            # First run ever: nothing to show yet, so wait for the initial scan
+            self._ready.wait()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, refresh_now):
+        if refresh_now or time.time() - self.last_refresh > self.refresh_interval:
+            self._safe_refresh()
+        while not self._stop.wait(self.refresh_interval):
+            self._safe_refresh()
+
+    def _safe_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print("App catalog refresh failed:", e)
+        finally:
+            self._ready.set()
+
+    def _scan(self, path, out):
+        """Walk `path`, reusing cached listings for directories whose mtime is unchanged."""
+        listed = reused = 0
+        stack = [path]
+        while stack:
+            d = stack.pop()
+            try:
+                mtime = os.stat(d).st_mtime
+            except OSError:
+                continue
+
+            cached = self._dirs.get(d)
+            if cached is not None and cached["mtime"] == mtime:
+                entry = cached
+                reused += 1
+            else:
+                entry = {"mtime": mtime, "subdirs": [], "files": {}}
+                try:
+                    with os.scandir(d) as it:
+                        for e in it:
+                            if e.is_dir(follow_symlinks=False):
+                                entry["subdirs"].append(e.path)
+                            elif e.name.lower().endswith(self.extensions):
+                                entry["files"][os.path.splitext(e.name)[0].lower()] = e.path
+                except OSError:
+                    continue
+                listed += 1
+
+            out[d] = entry
+            # A directory's mtime only covers its direct children, so always descend
+            stack.extend(entry["subdirs"])
+        return listed, reused
+
+    def _publish(self):
+        apps = {}
+        for entry in self._dirs.values():
+            apps.update(entry["files"])
+        apps.update(self._extra)
+        self._apps = apps
+        self.version += 1
+        for callback in self.on_update:
+            try:
+                callback(apps)
+            except Exception as e:
+                print("App catalog listener failed:", e)
+
+    def _save(self):
+        data = {
+            "version": CATALOG_VERSION,
+            "roots": self.roots,
+            "saved_at": self.last_refresh,
+            "dirs": self._dirs,
+            "extra": self._extra,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            tmp = f"{self.cache_file}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print("Could not save app catalog:", e)
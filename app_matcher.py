@@ -0,0 +1,124 @@
+import heapq
+from collections import defaultdict
+
+from fuzzywuzzy import fuzz, utils
+
+DEFAULT_THRESHOLD = 65
+MAX_CANDIDATES = 48          # entries scored per query after filtering
+COMMON_GRAM_FRACTION = 0.2   # trigrams in more than this share of entries don't discriminate
+
+
+def normalize_name(text):
+    """Same preprocessing fuzzywuzzy's process.extractOne applies, done once per name."""
+    return utils.full_process(text, force_ascii=True)
+
+
+def trigrams(norm):
+    padded = f" {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MatchEntry:
+    __slots__ = ("name", "norm", "kind", "target")
+
+    def __init__(self, name, norm, kind, target):
+        self.name = name      # key as it appears in its source dict
+        self.norm = norm
+        self.kind = kind      # "exe", "uwp", "app" or "website"
+        self.target = target  # command, AppsFolder id, shortcut path or site key
+
+
+class AppMatcher:
+    """
+    Fuzzy app-name lookup over a prebuilt index.
+
+    Names are normalized once at build time. A query collects candidates
+    from a trigram index (plus a two-letter token prefix index for short
+    queries) and runs fuzz.WRatio only on the best-overlapping ones,
+    instead of scoring every name like process.extractOne does.
+    """
+
+    def __init__(self, sources, max_candidates=MAX_CANDIDATES):
+        """
+        `sources` is a list of (kind, {name: target}) in priority order; when
+        two sources share a name, the earlier one wins.
+        """
+        self.max_candidates = max_candidates
+        self.entries = []
+        self._by_norm = {}
+        self._grams = defaultdict(list)
+        self._prefixes = defaultdict(list)
+        self._word_prefixes = set()   # "google" for "google chrome": names another name continues
+
+        for kind, mapping in sources:
+            for name, target in mapping.items():
+                norm = normalize_name(name)
+                if not norm or norm in self._by_norm:
+                    continue
+                idx = len(self.entries)
+                self.entries.append(MatchEntry(name, norm, kind, target))
+                self._by_norm[norm] = idx
+                for g in trigrams(norm):
+                    self._grams[g].append(idx)
+                for token in set(norm.split()):
+                    self._prefixes[token[:2]].append(idx)
+                words = norm.split()
+                for i in range(1, len(words)):
+                    self._word_prefixes.add(" ".join(words[:i]))
+
+        self._common_limit = max(self.max_candidates, int(len(self.entries) * COMMON_GRAM_FRACTION))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def exact(self, query):
+        """Entry whose normalized name equals the query's, or None."""
+        idx = self._by_norm.get(normalize_name(query))
+        return None if idx is None else self.entries[idx]
+
+    def continued(self, query):
+        """Whether a longer name starts with the query as whole words."""
+        return normalize_name(query) in self._word_prefixes
+
+    def candidates(self, norm):
+        exact = self._by_norm.get(norm)
+        if exact is not None:
+            return [exact]
+
+        counts = defaultdict(int)
+        grams = sorted(trigrams(norm), key=lambda g: len(self._grams.get(g, ())))
+        for i, g in enumerate(grams):
+            postings = self._grams.get(g)
+            if not postings:
+                continue
+            # Skip very common trigrams once the rarer ones have produced candidates
+            if len(postings) > self._common_limit and counts and i > 0:
+                break
+            for idx in postings:
+                counts[idx] += 1
+
+        for token in set(norm.split()):
+            for idx in self._prefixes.get(token[:2], ()):
+                counts[idx] += 1
+
+        if len(counts) <= self.max_candidates:
+            return list(counts)
+        return heapq.nlargest(self.max_candidates, counts, key=counts.__getitem__)
+
+    def match(self, query, threshold=DEFAULT_THRESHOLD):
+        """Best entry scoring at least `threshold`, as (entry, score), or None."""
+        norm = normalize_name(query)
+        if not norm:
+            return None
+
+        best, best_score = None, -1
+        for idx in sorted(self.candidates(norm)):
+            score = fuzz.WRatio(norm, self.entries[idx].norm, full_process=False)
+            if score > best_score:
+                best, best_score = self.entries[idx], score
+                if score == 100:
+                    break
+
+        if best is None or best_score < threshold:
+            return None
+        return best, best_score
@@ -0,0 +1,269 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import threading
+
+from flask import Response, abort, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+mimetypes.add_type("model/gltf-binary", ".glb")
+mimetypes.add_type("model/gltf+json", ".gltf")
+mimetypes.add_type("model/obj", ".obj")
+mimetypes.add_type("model/stl", ".stl")
+mimetypes.add_type("application/wasm", ".wasm")
+
+# Text-like and 3D formats that usually shrink well
+COMPRESSIBLE_EXTS = {
+    ".html", ".htm", ".css", ".js", ".mjs", ".json", ".map", ".svg", ".txt", ".xml",
+    ".ico", ".wasm", ".gltf", ".glb", ".bin", ".obj", ".mtl", ".stl", ".ply", ".fbx",
+}
+MIN_COMPRESS_SIZE = 1024          # smaller files are not worth a variant
+MAX_COMPRESS_RATIO = 0.9          # keep a variant only if it saves at least 10%
+BROTLI_MAX_QUALITY_SIZE = 1 << 20  # above this, use a faster brotli level
+
+# "app.3f9a1c2e.js" style names can be cached forever
+FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{8,}\.[^.]+$", re.IGNORECASE)
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+class Asset:
+    __slots__ = ("path", "size", "mtime", "digest", "mimetype", "fingerprinted", "variants")
+
+    def __init__(self, path, size, mtime, digest, mimetype, fingerprinted):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.digest = digest
+        self.mimetype = mimetype
+        self.fingerprinted = fingerprinted
+        self.variants = {}  # encoding -> compressed file path
+
+    def etag(self, encoding=None):
+        return self.digest if encoding is None else f"{self.digest}-{encoding}"
+
+
+class AssetStore:
+    """
+    Serves files from one directory with precompressed gzip/brotli variants,
+    strong content-hash ETags and range support.
+
+    Variants are content-addressed under `cache_dir`, so a restart only
+    compresses files whose contents changed. Files added or changed after
+    build() are served uncompressed until their variants are built in the
+    background.
+    """
+
+    def __init__(self, root, cache_dir):
+        self.root = os.path.abspath(root)
+        self.cache_dir = cache_dir
+        self._assets = {}       # normalized root-relative path -> Asset
+        self._compressing = set()
+        self._lock = threading.Lock()
+
+    def build(self):
+        """Hash and precompress every file under root. Call once at start-up."""
+        if not os.path.isdir(self.root):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        assets = {}
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                rel = self._key(path)
+                try:
+                    assets[rel] = self._index_file(path)
+                except OSError as e:
+                    print(f"Asset indexing failed for {rel}:", e)
+
+        with self._lock:
+            self._assets = assets
+        self._remove_stale_variants(assets.values())
+        print(f"Indexed {len(assets)} assets from {self.root}")
+
+    def lookup(self, filename):
+        """
+        Return the Asset for a URL path. A new or changed file is re-hashed for
+        a fresh ETag and served uncompressed while its variants are built.
+        """
+        key = filename
+        asset = self._assets.get(key)
+        if asset is None:
+            # "./app.js", "a//b.js" or "x/../app.js" share the entry of the file they name
+            path = safe_join(self.root, filename)
+            if path is None:
+                return None
+            key = self._key(path)
+            asset = self._assets.get(key)
+        path = asset.path if asset else os.path.join(self.root, key)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        if asset is not None and st.st_size == asset.size and st.st_mtime == asset.mtime:
+            return asset
+
+        try:
+            asset = self._index_file(path, compress=False)
+        except OSError:
+            return None
+        with self._lock:
+            self._assets[key] = asset
+        self._compress_in_background(key, asset)
+        return asset
+
+    def serve(self, filename):
+        asset = self.lookup(filename)
+        if asset is None:
+            abort(404)
+
+        # Read once: a background build may fill them in while this request runs
+        variants = asset.variants
+
+        # Compressed variants are only used for full responses; ranges get the identity bytes
+        encoding = None
+        if variants and "Range" not in request.headers:
+            accepted = request.accept_encodings
+            for candidate in ("br", "gzip"):
+                if candidate in variants and accepted[candidate]:
+                    encoding = candidate
+                    break
+
+        etag = asset.etag(encoding)
+        cache_control = IMMUTABLE_CACHE if asset.fingerprinted else REVALIDATE_CACHE
+
+        # Answer revalidation from the index alone, without opening the file
+        if request.if_none_match.contains_weak(etag):
+            rv = Response(status=304)
+            rv.set_etag(etag)
+            rv.headers["Cache-Control"] = cache_control
+            if variants:
+                rv.vary.add("Accept-Encoding")
+            return rv
+
+        path = variants[encoding] if encoding else asset.path
+        rv = send_file(
+            path,
+            mimetype=asset.mimetype,
+            conditional=True,
+            etag=etag,
+            last_modified=asset.mtime,
+        )
+        if encoding:
+            rv.headers["Content-Encoding"] = encoding
+        if variants:
+            rv.vary.add("Accept-Encoding")
+        rv.headers["Cache-Control"] = cache_control
+        return rv
+
+    # -------------------- Indexing --------------------
+    def _key(self, path):
+        rel = os.path.relpath(os.path.normpath(path), self.root)
+        return os.path.normcase(rel).replace(os.sep, "/")
+
+    def _index_file(self, path, compress=True):
+        st = os.stat(path)
+        digest = hash_file(path)
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        name = os.path.basename(path)
+        asset = Asset(path, st.st_size, st.st_mtime, digest, mimetype,
+                      bool(FINGERPRINT_RE.search(name)))
+        if compress and _compressible(asset):
+            asset.variants = self._build_variants(path, digest, st.st_size)
+        return asset
+
+    def _compress_in_background(self, key, asset):
+        if not _compressible(asset):
+            return
+        with self._lock:
+            if key in self._compressing:
+                return
+            self._compressing.add(key)
+        threading.Thread(target=self._compress, args=(key, asset), name="asset-compress", daemon=True).start()
+
+    def _compress(self, key, asset):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            asset.variants = self._build_variants(asset.path, asset.digest, asset.size)
+        except Exception as e:
+            print(f"Compressing {asset.path} failed:", e)
+        finally:
+            with self._lock:
+                self._compressing.discard(key)
+                current = self._assets.get(key)
+        # The file changed again while this ran; its newer entry still needs variants
+        if current is not None and current is not asset:
+            self._compress_in_background(key, current)
+
+    def _build_variants(self, path, digest, size):
+        variants = {}
+        encoders = [("gzip", ".gz", _gzip_file)]
+        if brotli is not None:
+            encoders.insert(0, ("br", ".br", _brotli_file))
+
+        for encoding, suffix, encode in encoders:
+            out = os.path.join(self.cache_dir, digest + suffix)
+            if not os.path.exists(out):
+                tmp = f"{out}.{os.getpid()}.tmp"
+                try:
+                    encode(path, tmp, size)
+                    os.replace(tmp, out)
+                except Exception as e:
+                    print(f"Compressing {path} ({encoding}) failed:", e)
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    continue
+            if os.path.getsize(out) <= size * MAX_COMPRESS_RATIO:
+                variants[encoding] = out
+        return variants
+
+    def _remove_stale_variants(self, assets):
+        # Keep every variant of current content, including ones that did not compress well
+        # enough to be served, so they are not rebuilt on the next start-up.
+        digests = {asset.digest for asset in assets}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith((".gz", ".br")) and name.split(".", 1)[0] not in digests:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+
+def _compressible(asset):
+    ext = os.path.splitext(asset.path)[1].lower()
+    return ext in COMPRESSIBLE_EXTS and asset.size >= MIN_COMPRESS_SIZE
+
+
+def hash_file(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()[:32]
+
+
+def _gzip_file(src, dst, size):
+    with open(src, "rb") as fin, open(dst, "wb") as raw:
+        # mtime=0 keeps the output byte-identical across rebuilds
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0) as fout:
+            shutil.copyfileobj(fin, fout, 1 << 20)
+
+
+def _brotli_file(src, dst, size):
+    quality = 11 if size <= BROTLI_MAX_QUALITY_SIZE else 6
+    compressor = brotli.Compressor(quality=quality)
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        for chunk in iter(lambda: fin.read(1 << 20), b""):
+            fout.write(compressor.process(chunk))
+        fout.write(compressor.finish())
@@ -0,0 +1,105 @@
+"""
+Benchmark for app_catalog.AppCatalog on a synthetic Start Menu tree.
+
+Compares the old full os.walk scan with the catalog's cold scan, load
+from disk, no-change refresh and refresh after one folder changed.
+Runs on any OS because roots and shortcut extension are configurable.
+
+Usage:
+    python benchmarks/bench_app_catalog.py --folders 400 --per-folder 25
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_catalog import AppCatalog  # noqa: E402
+
+
+def make_tree(root, folders, per_folder, depth=3):
+    for i in range(folders):
+        parts = [f"Vendor {i % 37}", f"Product {i % 211}", f"Suite {i}"][:depth]
+        d = os.path.join(root, *parts)
+        os.makedirs(d, exist_ok=True)
+        for j in range(per_folder):
+            open(os.path.join(d, f"App {i}-{j}.lnk"), "w").close()
+        open(os.path.join(d, "readme.txt"), "w").close()
+
+
+def full_walk(roots):
+    """What voicecommand.get_shortcuts() used to do on every refresh."""
+    shortcuts = {}
+    for path in roots:
+        for root, _, files in os.walk(path):
+            for f in files:
+                if f.lower().endswith(".lnk"):
+                    shortcuts[os.path.splitext(f)[0].lower()] = os.path.join(root, f)
+    return shortcuts
+
+
+def timed(label, fn, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    print(f"{label:<32} {best * 1000:9.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folders", type=int, default=400)
+    parser.add_argument("--per-folder", type=int, default=25)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="catalog-bench-")
+    try:
+        roots = [os.path.join(tmp, "machine"), os.path.join(tmp, "user")]
+        make_tree(roots[0], args.folders, args.per_folder)
+        make_tree(roots[1], args.folders // 4, args.per_folder)
+        cache_file = os.path.join(tmp, "catalog.json")
+
+        expected = timed("full os.walk scan", lambda: full_walk(roots))
+        print(f"{len(expected)} shortcuts")
+
+        def cold():
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+            return AppCatalog(roots=roots, cache_file=cache_file).refresh()
+
+        apps = timed("catalog cold scan + save", cold)
+        assert apps == expected, "catalog and os.walk disagree"
+
+        def load():
+            c = AppCatalog(roots=roots, cache_file=cache_file)
+            assert c.load()
+            return c.apps()
+
+        timed("catalog load from disk", load)
+
+        warm = AppCatalog(roots=roots, cache_file=cache_file)
+        warm.load()
+        timed("incremental refresh, no change", warm.refresh)
+        print(f"  {warm.last_scan_stats}")
+
+        changed = os.path.join(roots[0], "Vendor 1", "Product 1", "Suite 1")
+
+        def touch_one():
+            open(os.path.join(changed, f"New {time.perf_counter_ns()}.lnk"), "w").close()
+            return warm.refresh()
+
+        timed("incremental refresh, 1 dir new", touch_one)
+        print(f"  {warm.last_scan_stats}")
+        assert warm.apps() == full_walk(roots), "incremental refresh missed a change"
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Per-query latency of app-name matching over a synthetic 10k-entry catalog.
+
+Compares the old approach (rebuild the choice list and run
+fuzzywuzzy.process.extractOne over everything) with app_matcher.AppMatcher,
+and reports how often both pick the same name.
+
+Usage:
+    python benchmarks/bench_app_matcher.py --entries 10000 --queries 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzywuzzy import process  # noqa: E402
+
+from app_matcher import AppMatcher  # noqa: E402
+
+VENDORS = ["microsoft", "adobe", "google", "mozilla", "jetbrains", "autodesk", "oracle", "valve",
+           "nvidia", "intel", "logitech", "zoom", "slack", "spotify", "discord", "vmware"]
+WORDS = ["studio", "player", "editor", "manager", "center", "viewer", "reader", "tools", "console",
+         "assistant", "launcher", "updater", "designer", "recorder", "monitor", "sync", "cloud",
+         "office", "photo", "video", "audio", "code", "terminal", "browser", "notes", "mail"]
+
+
+def make_names(n, rng):
+    names = set()
+    while len(names) < n:
+        parts = [rng.choice(VENDORS)] + rng.sample(WORDS, rng.randint(1, 3))
+        if rng.random() < 0.3:
+            parts.append(str(rng.randint(2010, 2025)))
+        names.add(" ".join(parts))
+    return sorted(names)
+
+
+def misspell(name, rng):
+    chars = list(name)
+    for _ in range(max(1, len(chars) // 10)):
+        i = rng.randrange(len(chars))
+        op = rng.random()
+        if op < 0.4:
+            chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        elif op < 0.7:
+            del chars[i]
+        else:
+            chars.insert(i, chars[i])
+    return "".join(chars)
+
+
+def make_queries(names, count, rng):
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        kind = rng.random()
+        if kind < 0.3:
+            queries.append(name)
+        elif kind < 0.7:
+            queries.append(misspell(name, rng))
+        else:
+            # Users often say only part of the name ("photo editor")
+            words = name.split()
+            queries.append(" ".join(words[1:]) if len(words) > 2 else words[-1])
+    return queries
+
+
+def bench(label, fn, queries):
+    lat = []
+    results = []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append(fn(q))
+        lat.append(time.perf_counter() - t0)
+    lat.sort()
+    mean = sum(lat) / len(lat) * 1000
+    p95 = lat[int(0.95 * (len(lat) - 1))] * 1000
+    print(f"{label:<28} mean {mean:8.3f} ms   p95 {p95:8.3f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = make_names(args.entries, rng)
+    app_map = {n: f"C:\\Start Menu\\{n}.lnk" for n in names}
+    queries = make_queries(names, args.queries, rng)
+
+    t0 = time.perf_counter()
+    matcher = AppMatcher([("app", app_map)])
+    print(f"{len(matcher)} entries, index built in {(time.perf_counter() - t0) * 1000:.1f} ms\n")
+
+    def linear(q):
+        choices = list(app_map.keys())
+        match = process.extractOne(q, choices)
+        return match if match and match[1] >= 65 else None
+
+    def indexed(q):
+        match = matcher.match(q)
+        return (match[0].name, match[1]) if match else None
+
+    old = bench("extractOne (linear scan)", linear, queries)
+    new = bench("AppMatcher (indexed)", indexed, queries)
+
+    same_name = sum(1 for a, b in zip(old, new) if (a and a[0]) == (b and b[0]))
+    same_score = sum(1 for a, b in zip(old, new) if (a and a[1]) == (b and b[1]))
+    print(f"\nsame pick: {same_name}/{len(queries)}   same best score: {same_score}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Frame time and model rates of the fused hand+face loop under each
+frame_scheduler strategy, with the two models replaced by sleeps of the
+given length (MediaPipe releases the GIL while it runs, as sleep does).
+
+Reports mean/p95 frame time, the share of frames over budget, the loop rate,
+how often a face result came back, and how old face results were when the
+loop got them.
+
+Usage:
+    python benchmarks/bench_fused_scheduler.py --hand-ms 14 --face-ms 20 --overhead-ms 6
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_scheduler import FusedRunner, ModelScheduler  # noqa: E402
+
+
+def fake_model(ms):
+    def run(image):
+        time.sleep(ms / 1000)
+        return image
+    return run
+
+
+def run(label, args, scheduler):
+    runner = FusedRunner(fake_model(args.hand_ms), fake_model(args.face_ms), scheduler)
+    frames = []
+    face_results = 0
+    face_age = []
+    start = time.perf_counter()
+    for i in range(args.frames):
+        t0 = time.perf_counter()
+        time.sleep(args.overhead_ms / 1000)  # capture + preprocess + display
+        _, face, face_time = runner.run(i, captured=t0)
+        if face is not None:
+            face_results += 1
+            face_age.append((time.perf_counter() - face_time) * 1000)
+        frame_ms = (time.perf_counter() - t0) * 1000
+        runner.end_frame(frame_ms)
+        frames.append(frame_ms)
+    elapsed = time.perf_counter() - start
+    runner.close()
+
+    warm = frames[60:] or frames
+    warm.sort()
+    over = sum(1 for f in warm if f > args.budget_ms) / len(warm)
+    mean_age = sum(face_age) / len(face_age) if face_age else 0
+    mode = runner.scheduler.mode + (f"/{runner.scheduler.face_interval}" if runner.scheduler.face_interval > 1 else "")
+    print(f"{label:<26} {mode:<13} {sum(warm) / len(warm):7.1f} {warm[int(0.95 * (len(warm) - 1))]:7.1f} "
+          f"{over:8.0%} {args.frames / elapsed:7.1f} {face_results / elapsed:7.1f} {mean_age:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hand-ms", type=float, default=14)
+    parser.add_argument("--face-ms", type=float, default=20)
+    parser.add_argument("--overhead-ms", type=float, default=6)
+    parser.add_argument("--budget-ms", type=float, default=33)
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"hand {args.hand_ms} ms, face {args.face_ms} ms, other {args.overhead_ms} ms, "
+          f"budget {args.budget_ms} ms\n")
+    print(f"{'strategy':<26} {'final mode':<13} {'mean ms':>7} {'p95 ms':>7} {'>budget':>8} "
+          f"{'loop Hz':>7} {'face Hz':>7} {'face age':>8}")
+
+    never = dict(budget_ms=1e9)  # budget never exceeded -> always serial
+    run("serial (no scheduler)", args, ModelScheduler(**never))
+    run("adaptive, one core", args, ModelScheduler(budget_ms=args.budget_ms, allow_async=False))
+    run("adaptive, two+ cores", args, ModelScheduler(budget_ms=args.budget_ms, allow_async=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Accuracy against per-frame latency for the gesture-keyboard classifier.
+
+By default the data is synthetic: one random hand pose (finger curls and
+spread) per key, sampled with pose noise, rotation, scale, position and
+landmark jitter. Pass --data to use sessions recorded with
+AIKeyboard/collect_landmarks.py instead.
+
+Compares nearest-prototype models with 1-8 prototypes per key against
+exact 1-nearest-neighbour over every training sample. Latency is one
+frame's features plus prediction, as inference_classifier.py runs it.
+
+Usage:
+    python benchmarks/bench_keyboard_model.py
+    python benchmarks/bench_keyboard_model.py --data AIKeyboard/data/*.csv
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AIKeyboard"))
+
+from keyboard_model import (  # noqa: E402
+    DEFAULT_LABELS, CentroidModel, features_matrix, landmark_features, load_sessions,
+)
+
+# Rough hand geometry, wrist at the origin, y pointing up the image (negative)
+BASES = [(-0.35, -0.25), (-0.2, -0.9), (0.0, -0.95), (0.2, -0.9), (0.38, -0.8)]
+DIRECTIONS = [-2.3, -1.75, -1.57, -1.4, -1.2]
+SEGMENTS = [(0.3, 0.3, 0.25), (0.4, 0.25, 0.2), (0.45, 0.28, 0.2), (0.4, 0.26, 0.2), (0.3, 0.2, 0.18)]
+
+
+def make_hand(curls, spread):
+    pts = [(0.0, 0.0, 0.0)]
+    for f in range(5):
+        x, y = BASES[f]
+        z = 0.0
+        pts.append((x, y, z))
+        angle = DIRECTIONS[f] + spread[f]
+        for seg in SEGMENTS[f]:
+            angle += curls[f] * 1.2
+            x += seg * math.cos(angle)
+            y += seg * math.sin(angle)
+            z -= seg * curls[f] * 0.5
+            pts.append((x, y, z))
+    return np.array(pts, dtype=np.float32)
+
+
+def synthetic(labels, samples, rng):
+    templates = {}
+    seen = set()
+    for label in labels:
+        while True:
+            curls = tuple(rng.choice([0.0, 0.5, 1.0], size=5))
+            if curls not in seen:
+                seen.add(curls)
+                break
+        templates[label] = (np.array(curls), rng.normal(0, 0.15, size=5))
+
+    points, hands, y = [], [], []
+    for label, (curls, spread) in templates.items():
+        for _ in range(samples):
+            pts = make_hand(np.clip(curls + rng.normal(0, 0.1, 5), 0, 1.2), spread + rng.normal(0, 0.06, 5))
+            a = rng.normal(0, 0.3)
+            rot = np.array([[math.cos(a), -math.sin(a)], [math.sin(a), math.cos(a)]], dtype=np.float32)
+            pts[:, :2] = pts[:, :2] @ rot.T
+            pts *= rng.uniform(0.12, 0.3)
+            pts[:, :2] += rng.uniform(0.3, 0.7, size=2)
+            pts += rng.normal(0, 0.003, pts.shape).astype(np.float32)
+            points.append(pts)
+            hands.append("Right")
+            y.append(label)
+    return np.stack(points), hands, y
+
+
+class NearestNeighbour:
+    """Baseline: exact 1-NN over every training sample (standardized)."""
+
+    def __init__(self, X, y):
+        self.mean = X.mean(0)
+        self.scale = X.std(0)
+        self.scale[self.scale < 1e-6] = 1.0
+        self.Z = (X - self.mean) / self.scale
+        self.sq = (self.Z ** 2).sum(1)
+        self.y = np.asarray(y)
+
+    def predict(self, features):
+        z = (features - self.mean) / self.scale
+        return self.y[int((self.sq - 2.0 * (self.Z @ z)).argmin())], 0.0
+
+
+def bench(label, model, points, hands, y):
+    correct = 0
+    lat = []
+    for p, h, true in zip(points, hands, y):
+        t0 = time.perf_counter()
+        pred, _ = model.predict(landmark_features(p, h))
+        lat.append(time.perf_counter() - t0)
+        correct += pred == true
+    lat.sort()
+    size = getattr(model, "prototypes", getattr(model, "Z", None))
+    print(f"{label:<22} {len(size):>7} {correct / len(y):>9.1%} {sum(lat) / len(lat) * 1e6:>9.1f} "
+          f"{lat[int(0.99 * (len(lat) - 1))] * 1e6:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", nargs="*", help="recorded CSV sessions instead of synthetic hands")
+    parser.add_argument("--samples", type=int, default=200, help="synthetic samples per key")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.data:
+        points, hands, y = load_sessions(args.data)
+    else:
+        points, hands, y = synthetic(DEFAULT_LABELS, args.samples, rng)
+    y = np.asarray(y)
+
+    order = rng.permutation(len(y))
+    cut = int(len(y) * 0.8)
+    train, test = order[:cut], order[cut:]
+    X = features_matrix(points[train], [hands[i] for i in train])
+    test_points = points[test]
+    test_hands = [hands[i] for i in test]
+    print(f"{len(set(y.tolist()))} keys, {len(train)} training / {len(test)} test samples\n")
+    print(f"{'model':<22} {'vectors':>7} {'accuracy':>9} {'mean us':>9} {'p99 us':>9}")
+
+    for k in (1, 2, 4, 8):
+        model = CentroidModel.fit(X, y[train], per_class=k)
+        bench(f"centroids x{k}", model, test_points, test_hands, y[test])
+    bench("1-NN, all samples", NearestNeighbour(X, y[train]), test_points, test_hands, y[test])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Login-storm benchmark: many users log in at once (shift start) while
+other users keep hitting /api/me and /api/chat/history. Shows whether
+cheap authenticated endpoints stay responsive while passwords are hashed.
+
+Runs the same storm against inline hashing (PASSWORD_HASH_WORKERS=0)
+and against the process pool, so the two can be compared side by side.
+
+Usage:
+    python benchmarks/bench_login.py --storm 32 --probes 8 --duration 15
+    python benchmarks/bench_login.py --workers 4 --method pbkdf2:sha256:600000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadtest import AppStack, Stats, VirtualUser  # noqa: E402
+
+
+def run_storm(workers, method, storm, probes, duration):
+    stack = AppStack(llm_latency=0, search_latency=0, extra_env={
+        "PASSWORD_HASH_WORKERS": str(workers),
+        "PASSWORD_HASH_METHOD": method,
+    })
+    try:
+        # Register everyone first so the measured window only contains the storm
+        setup_stats = Stats()
+        stormers = [VirtualUser(stack.base_url, setup_stats) for _ in range(storm)]
+        probers = [VirtualUser(stack.base_url, setup_stats) for _ in range(probes)]
+        stats = Stats()
+        for user in stormers + probers:
+            user.setup()
+            user.stats = stats
+
+        stop_at = time.time() + duration
+
+        def storm_loop(user):
+            while time.time() < stop_at:
+                user.do("login")
+
+        def probe_loop(user):
+            while time.time() < stop_at:
+                user.do("me")
+                user.do("history")
+
+        threads = [threading.Thread(target=storm_loop, args=(u,)) for u in stormers]
+        threads += [threading.Thread(target=probe_loop, args=(u,)) for u in probers]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        label = "inline hashing" if workers <= 0 else f"process pool, {workers} workers"
+        stats.report(time.perf_counter() - start, title=f"{label}, {storm} logging in, {probes} probing")
+    finally:
+        stack.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storm", type=int, default=32, help="users logging in continuously")
+    parser.add_argument("--probes", type=int, default=8, help="users hitting /api/me and history")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--method", default="scrypt:32768:8:1", help="werkzeug hash method / work factor")
+    args = parser.parse_args()
+
+    for workers in (0, args.workers):
+        run_storm(workers, args.method, args.storm, args.probes, args.duration)
+
+
+if __name__ == "__main__":
+    main()
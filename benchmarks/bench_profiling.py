@@ -0,0 +1,82 @@
+"""
+Overhead of profiling.py on a simulated control loop.
+
+Each frame runs the same stages AImouse.py/eyecontrol.py trace (capture,
+preprocess, inference, classify, inject, render) around busy work of a
+realistic size, and compares frame time with tracing off, tracing on,
+and tracing on with stack sampling.
+
+Usage:
+    python benchmarks/bench_profiling.py --frames 600 --frame-ms 15
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiling  # noqa: E402
+
+STAGES = [("capture", 0.25), ("preprocess", 0.05), ("inference", 0.5),
+          ("classify", 0.05), ("inject", 0.05), ("render", 0.1)]
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run_loop(tracer, frames, frame_s):
+    t0 = time.perf_counter()
+    for i in range(frames):
+        start = tracer.now()
+        for name, share in STAGES:
+            with tracer.span(name):
+                busy(frame_s * share)
+        tracer.record("frame", start)
+        if i % 30 == 0:
+            tracer.counter("fps", 30)
+    return (time.perf_counter() - t0) / frames
+
+
+def per_call_cost(tracer, n=200000):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        with tracer.span("x"):
+            pass
+    return (time.perf_counter() - t0) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--frame-ms", type=float, default=15.0, help="work per frame")
+    args = parser.parse_args()
+    frame_s = args.frame_ms / 1000
+
+    tmp = tempfile.mkdtemp(prefix="trace-bench-")
+    off = profiling.NullTracer()
+    on = profiling.Tracer(os.path.join(tmp, "on.json"), "bench")
+    sampled = profiling.Tracer(os.path.join(tmp, "sampled.json"), "bench")
+
+    print(f"span cost: off {per_call_cost(off) * 1e9:.0f} ns, on {per_call_cost(on) * 1e9:.0f} ns")
+    on.flush()
+
+    base = run_loop(off, args.frames, frame_s)
+    traced = run_loop(on, args.frames, frame_s)
+    # Sampling thread only while its own loop runs, so it can't skew the two above
+    sampled.start_sampling()
+    with_samples = run_loop(sampled, args.frames, frame_s)
+    for tracer in (on, sampled):
+        tracer.close()
+
+    print(f"frame time off       {base * 1000:8.3f} ms")
+    print(f"frame time traced    {traced * 1000:8.3f} ms   overhead {100 * (traced - base) / base:+.2f}%")
+    print(f"frame time + samples {with_samples * 1000:8.3f} ms   overhead {100 * (with_samples - base) / base:+.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Load test for chat persistence: many request threads each read recent
+history and store one message, like /api/chat does.
+
+  baseline      default rollback journal, one commit per message
+  wal           WAL + tuned pragmas, still one commit per message
+  write-behind  WAL + WriteBehindQueue batching commits in the background
+
+Usage:
+    python benchmarks/bench_sqlite_writes.py --threads 16 --messages 200
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from write_behind import WriteBehindQueue  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE chat_message (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    user_message TEXT NOT NULL,
+    bot_reply TEXT NOT NULL,
+    created_at DATETIME
+);
+CREATE INDEX ix_chat_user ON chat_message (user_id, created_at);
+"""
+
+INSERT = "INSERT INTO chat_message (user_id, user_message, bot_reply, created_at) VALUES (?, ?, ?, ?)"
+HISTORY = "SELECT user_message, bot_reply FROM chat_message WHERE user_id = ? ORDER BY created_at DESC LIMIT 10"
+
+
+def connect(path, tuned):
+    conn = sqlite3.connect(path, timeout=15, check_same_thread=False)
+    if tuned:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=15000")
+        conn.execute("PRAGMA cache_size=-16000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def run(mode, threads, messages, batch_size):
+    tmp = tempfile.mkdtemp(prefix="chatbench-")
+    path = os.path.join(tmp, "bench.db")
+    tuned = mode != "baseline"
+
+    setup = connect(path, tuned)
+    setup.executescript(SCHEMA)
+    setup.commit()
+
+    writer = None
+    if mode == "write-behind":
+        writer_conn = connect(path, tuned)
+
+        def flush(rows):
+            with writer_conn:
+                writer_conn.executemany(INSERT, rows)
+
+        writer = WriteBehindQueue(flush, batch_size=batch_size, flush_interval=0.05)
+
+    latencies = []
+    lat_lock = threading.Lock()
+    reply = "x" * 400
+
+    def worker(user_id):
+        conn = connect(path, tuned)
+        local = []
+        for i in range(messages):
+            row = (user_id, f"question {i}", reply, datetime.datetime.utcnow().isoformat())
+            t0 = time.perf_counter()
+            if writer is not None:
+                # Same read as /api/chat: queued rows first, then the DB
+                writer.pending(lambda r: r[0] == user_id)
+            conn.execute(HISTORY, (user_id,)).fetchall()
+            if writer is not None:
+                writer.put(row)
+            else:
+                with conn:
+                    conn.execute(INSERT, row)
+            local.append(time.perf_counter() - t0)
+        conn.close()
+        with lat_lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(u,)) for u in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    if writer is not None:
+        writer.close()
+    elapsed = time.perf_counter() - start
+
+    total = setup.execute("SELECT COUNT(*) FROM chat_message").fetchone()[0]
+    setup.close()
+    assert total == threads * messages, f"{mode}: expected {threads * messages} rows, got {total}"
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+    print(f"{mode:<13} {total / elapsed:9.0f} msg/s   "
+          f"p50 {pct(50):7.2f} ms   p95 {pct(95):7.2f} ms   p99 {pct(99):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--messages", type=int, default=200, help="messages per thread")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--modes", default="baseline,wal,write-behind")
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.messages} messages")
+    for mode in args.modes.split(","):
+        run(mode.strip(), args.threads, args.messages, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
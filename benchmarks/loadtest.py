@@ -0,0 +1,353 @@
+"""
+Load-testing harness for the Flask API (app.py).
+
+Starts app.py in a subprocess against local stand-ins:
+  - a stub Gemini endpoint (generateContent) with configurable latency
+  - a stub Google Custom Search endpoint with configurable latency
+  - benchmarks/stub_control_service.py instead of the real controller
+
+Then drives a weighted mix of login, chat, history, me and /run traffic
+from N concurrent virtual users and reports requests/sec and p50/p95/p99
+latency per endpoint.
+
+Usage:
+    python benchmarks/loadtest.py --concurrency 32 --duration 30
+    python benchmarks/loadtest.py --mix chat=1,history=1 --llm-latency 0.8
+    python benchmarks/loadtest.py --target http://127.0.0.1:5000   # existing server
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUB_CONTROLLER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_control_service.py")
+
+DEFAULT_MIX = {"chat": 40, "history": 20, "me": 20, "login": 10, "run": 10}
+
+QUESTIONS = [
+    "How do I switch to eye control?",
+    "What does the hand gesture for right click look like?",
+    "Why is my cursor jittery?",
+    "Can I use voice commands to open Chrome?",
+    "How do I stop all control modes?",
+]
+RUN_SCRIPTS = ["AImouse.py", "eyecontrol.py", "voicecommand.py", "stop"]
+
+
+# -------------------- Stub LLM / search servers --------------------
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    llm_latency = 0.5
+    search_latency = 0.2
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _sleep(self, base):
+        if base > 0:
+            time.sleep(max(0.0, random.uniform(0.8, 1.2) * base))
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/customsearch/v1"):
+            self._sleep(self.search_latency)
+            items = [
+                {"title": f"Result {i}", "link": f"https://example.com/{i}",
+                 "snippet": "Stub search snippet " * 5}
+                for i in range(5)
+            ]
+            self._send_json({"items": items})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if ":generateContent" in self.path:
+            self._sleep(self.llm_latency)
+            self._send_json({
+                "candidates": [{
+                    "content": {"role": "model", "parts": [{"text": "Stub reply. " * 20}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }],
+                "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 40, "totalTokenCount": 140},
+            })
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stubs(llm_latency, search_latency):
+    """Start the stub LLM + search server in a background thread. Returns (server, base_url)."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {
+        "llm_latency": llm_latency,
+        "search_latency": search_latency,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", free_port()), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# -------------------- App under test --------------------
+class AppStack:
+    """app.py in a subprocess, wired to the stubs and a throwaway database."""
+
+    def __init__(self, llm_latency=0.5, search_latency=0.2, extra_env=None):
+        self.workdir = tempfile.mkdtemp(prefix="vch-loadtest-")
+        self.stub_server, stub_url = start_stubs(llm_latency, search_latency)
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+
+        env = dict(os.environ)
+        env.update({
+            "GEMINI_API_KEY": "stub-key",
+            "GOOGLE_API_KEY": "stub-key",
+            "GOOGLE_CSE_ID": "stub-cse",
+            "GEMINI_BASE_URL": stub_url,
+            "GOOGLE_CSE_URL": f"{stub_url}/customsearch/v1",
+            "DATABASE_URL": "sqlite:///" + os.path.join(self.workdir, "app.db"),
+            "CONTROL_COMMAND_FILE": os.path.join(self.workdir, "control_command.json"),
+            "CONTROL_COMMAND_DIR": os.path.join(self.workdir, "control_commands"),
+            "CONTROL_STATUS_FILE": os.path.join(self.workdir, "control_status.json"),
+            "CONTROL_SERVICE_SCRIPT": STUB_CONTROLLER,
+        })
+        env.update(extra_env or {})
+
+        code = (
+            "import app; app.init_app(); "
+            f"app.app.run(host='127.0.0.1', port={self.port}, threaded=True, debug=False, use_reloader=False)"
+        )
+        self.log = open(os.path.join(self.workdir, "app.log"), "w")
+        # Own process group, so close() also reaches the controller app.py spawns
+        # and the password-hashing workers
+        self.proc = subprocess.Popen([sys.executable, "-c", code], cwd=BASE_DIR, env=env,
+                                     stdout=self.log, stderr=subprocess.STDOUT,
+                                     start_new_session=os.name != "nt")
+        self._wait_ready()
+
+    def _wait_ready(self, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"app.py exited early, see {self.log.name}")
+            try:
+                requests.get(f"{self.base_url}/api/me", timeout=1)
+                return
+            except requests.RequestException:
+                time.sleep(0.2)
+        raise RuntimeError("app.py did not start in time")
+
+    def close(self):
+        self._stop_app()
+        self.stub_server.shutdown()
+        self.log.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _stop_app(self):
+        if os.name == "nt":
+            # No process groups here; the stub controller exits by itself once
+            # the app is gone (see stub_control_service.py)
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+            return
+        self._signal_group(signal.SIGTERM)
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            pass
+        # Anything in the group still alive (the app, its controller, pool workers)
+        self._signal_group(signal.SIGKILL)
+        self.proc.wait()
+
+    def _signal_group(self, sig):
+        try:
+            os.killpg(self.proc.pid, sig)
+        except ProcessLookupError:
+            pass
+
+
+# -------------------- Load generation --------------------
+def percentile(sorted_values, p):
+    """Nearest-rank percentile in milliseconds of an already sorted list of seconds."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))] * 1000
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}   # endpoint -> [latency seconds]
+        self.errors = {}    # endpoint -> count
+
+    def record(self, endpoint, latency, ok):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(latency)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def report(self, elapsed, title="Results"):
+        print(f"\n{title} ({elapsed:.1f} s)")
+        print(f"{'endpoint':<10} {'count':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        total = 0
+        for endpoint in sorted(self.samples):
+            lat = sorted(self.samples[endpoint])
+            total += len(lat)
+            print(f"{endpoint:<10} {len(lat):>7} {self.errors.get(endpoint, 0):>7} "
+                  f"{len(lat) / elapsed:>8.1f} {percentile(lat, 50):>9.1f} "
+                  f"{percentile(lat, 95):>9.1f} {percentile(lat, 99):>9.1f}")
+        print(f"{'total':<10} {total:>7} {sum(self.errors.values()):>7} {total / elapsed:>8.1f}")
+
+    def summary(self, elapsed):
+        out = {}
+        for endpoint, lat in self.samples.items():
+            lat = sorted(lat)
+            out[endpoint] = {
+                "count": len(lat),
+                "errors": self.errors.get(endpoint, 0),
+                "rps": len(lat) / elapsed,
+                "p50_ms": percentile(lat, 50),
+                "p95_ms": percentile(lat, 95),
+                "p99_ms": percentile(lat, 99),
+            }
+        return out
+
+
+class VirtualUser:
+    def __init__(self, base_url, stats, password="loadtest-pass"):
+        self.base_url = base_url
+        self.stats = stats
+        self.http = requests.Session()
+        self.username = f"lt_{uuid.uuid4().hex[:12]}"
+        self.password = password
+
+    def call(self, endpoint, method, path, payload=None):
+        t0 = time.perf_counter()
+        try:
+            resp = self.http.request(method, self.base_url + path, json=payload, timeout=60)
+            ok = resp.status_code < 400
+        except requests.RequestException:
+            ok = False
+        self.stats.record(endpoint, time.perf_counter() - t0, ok)
+        return ok
+
+    def setup(self):
+        creds = {"username": self.username, "password": self.password}
+        self.call("register", "POST", "/api/register", creds)
+        self.call("login", "POST", "/api/login", creds)
+
+    def do(self, action):
+        if action == "chat":
+            self.call("chat", "POST", "/api/chat", {"message": random.choice(QUESTIONS)})
+        elif action == "history":
+            self.call("history", "GET", "/api/chat/history")
+        elif action == "me":
+            self.call("me", "GET", "/api/me")
+        elif action == "login":
+            self.call("login", "POST", "/api/login", {"username": self.username, "password": self.password})
+        elif action == "run":
+            self.call("run", "POST", "/run", {"script": random.choice(RUN_SCRIPTS)})
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f"Unknown endpoints in mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def run_load(base_url, concurrency, duration, mix, think_time=0.0, stats=None):
+    """Drive `concurrency` virtual users for `duration` seconds. Returns (stats, elapsed)."""
+    stats = stats or Stats()
+    actions = list(mix)
+    weights = [mix[a] for a in actions]
+    stop_at = time.time() + duration
+
+    def user_loop():
+        user = VirtualUser(base_url, stats)
+        user.setup()
+        while time.time() < stop_at:
+            user.do(random.choices(actions, weights)[0])
+            if think_time:
+                time.sleep(random.uniform(0, 2 * think_time))
+
+    threads = [threading.Thread(target=user_loop, daemon=True) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load per run")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help="weighted endpoint mix, e.g. chat=4,history=2,me=2,login=1,run=1")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between requests per user")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub Gemini latency in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.2, help="stub search latency in seconds")
+    parser.add_argument("--target", help="base URL of an already running app (skips starting stubs)")
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    stack = None
+    base_url = args.target
+    if not base_url:
+        stack = AppStack(args.llm_latency, args.search_latency)
+        base_url = stack.base_url
+        print(f"App running at {base_url} (logs in {stack.workdir})")
+
+    try:
+        print(f"Driving {args.concurrency} users for {args.duration:.0f} s, mix {mix}")
+        stats, elapsed = run_load(base_url, args.concurrency, args.duration, mix, args.think_time)
+        stats.report(elapsed)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"concurrency": args.concurrency, "mix": mix,
+                           "endpoints": stats.summary(elapsed)}, f, indent=2)
+    finally:
+        if stack:
+            stack.close()
+
+
+if __name__ == "__main__":
+    main()
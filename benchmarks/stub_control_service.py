@@ -0,0 +1,48 @@
+"""
+Stand-in for control_service.py used by the load tests. It consumes the
+legacy command file and the command directory the same way but only
+logs the commands instead of launching camera or microphone scripts.
+It exits once the app that started it is gone or the load test has
+removed its working directory, so an aborted run does not leave it behind.
+"""
+import json
+import os
+import time
+
+COMMAND_FILE = os.environ["CONTROL_COMMAND_FILE"]
+COMMAND_DIR = os.environ["CONTROL_COMMAND_DIR"]
+STATUS_FILE = os.environ["CONTROL_STATUS_FILE"]
+PARENT_PID = os.getppid()
+
+
+def write_status():
+    tmp = STATUS_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"updated": time.time(), "controller_pid": os.getpid(), "sessions": {}}, f)
+    os.replace(tmp, STATUS_FILE)
+
+
+def orphaned():
+    return os.getppid() != PARENT_PID or not os.path.isdir(os.path.dirname(STATUS_FILE))
+
+
+def main_loop():
+    os.makedirs(COMMAND_DIR, exist_ok=True)
+    while not orphaned():
+        try:
+            if os.path.exists(COMMAND_FILE):
+                with open(COMMAND_FILE, "r", encoding="utf-8") as f:
+                    json.load(f)
+                os.remove(COMMAND_FILE)
+            for fname in sorted(os.listdir(COMMAND_DIR)):
+                if fname.endswith(".json"):
+                    os.remove(os.path.join(COMMAND_DIR, fname))
+            write_status()
+        except Exception:
+            # app.py may be mid-write; pick it up on the next pass
+            pass
+        time.sleep(0.05)
+
+
+if __name__ == "__main__":
+    main_loop()
@@ -9,9 +9,26 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "").strip()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "").strip()
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID", "").strip()
 
+# Override these to point at local stand-ins (see benchmarks/loadtest.py)
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "").strip()
+GOOGLE_CSE_URL = os.getenv("GOOGLE_CSE_URL", "https://www.googleapis.com/customsearch/v1").strip()
+
+CHAT_MODEL = "gemini-2.5-flash"
+PROMPT_VERSION = "1"  # bump when the system prompts below change
+
+def reply_context_fingerprint() -> str:
+    """
+    Everything besides the message itself that shapes a reply. Cached replies
+    from a different model, prompt or search setup are not reused.
+    """
+    search = "search" if GOOGLE_API_KEY and GOOGLE_CSE_ID else "nosearch"
+    return f"{CHAT_MODEL}|prompt-{PROMPT_VERSION}|{search}"
+
 def get_gemini_client():
     if not GEMINI_API_KEY:
         raise RuntimeError("GEMINI_API_KEY not set in environment variables.")
+    if GEMINI_BASE_URL:
+        return genai.Client(api_key=GEMINI_API_KEY, http_options={"base_url": GEMINI_BASE_URL})
     return genai.Client(api_key=GEMINI_API_KEY)
 
 def google_search(query: str, num_results: int = 5):
@@ -29,7 +46,7 @@ def google_search(query: str, num_results: int = 5):
         "num": num_results,
     }
     try:
-        resp = requests.get("https://www.googleapis.com/customsearch/v1", params=params, timeout=10)
+        resp = requests.get(GOOGLE_CSE_URL, params=params, timeout=10)
         resp.raise_for_status()
         data = resp.json()
         items = data.get("items", [])
@@ -95,7 +112,7 @@ def generate_chat_reply(user_message: str, history: list[dict] | None = None) ->
         contents = system_prompt + history_text + f"User message: {user_message}"
 
     resp = client.models.generate_content(
-    model="gemini-2.5-flash",
+    model=CHAT_MODEL,
     contents=contents,
 )
 
@@ -3,12 +3,29 @@ import json
 import time
 import subprocess
 import sys
+import signal
+
+from session_env import parse_region
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 # Base folder (where app.py and this file live)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# This file is shared with app.py
-COMMAND_FILE = os.path.join(BASE_DIR, "control_command.json")
+# Legacy single-command file, still honoured: {"mode": ...} switches the "default" session
+COMMAND_FILE = os.getenv("CONTROL_COMMAND_FILE", os.path.join(BASE_DIR, "control_command.json"))
+# app.py drops one JSON file per command here; they are processed in name (= time) order
+COMMAND_DIR = os.getenv("CONTROL_COMMAND_DIR", os.path.join(BASE_DIR, "control_commands"))
+# Written by this service, read by app.py's /run/status
+STATUS_FILE = os.getenv("CONTROL_STATUS_FILE", os.path.join(BASE_DIR, "control_status.json"))
+
+# Cores kept free for the web app and the OS; the rest are shared between sessions
+RESERVED_CORES = int(os.getenv("CONTROL_RESERVED_CORES", "1"))
+MAX_SESSIONS = int(os.getenv("CONTROL_MAX_SESSIONS", "8"))
+DEFAULT_SESSION = "default"
 
 # Map modes to your real Python scripts
 SCRIPTS = {
@@ -16,83 +33,348 @@ SCRIPTS = {
     "eye": os.path.join(BASE_DIR, "eyecontrol.py"),
     "voice": os.path.join(BASE_DIR, "voicecommand.py"),
     "keyboard": os.path.join(BASE_DIR, "AIKeyboard", "inference_classifier.py"),
+    "fused": os.path.join(BASE_DIR, "fusedcontrol.py"),       # hand cursor + wink clicks
     # adjust if different
 }
+# Modes that open a camera (two sessions can't share one)
+CAMERA_MODES = {"hand", "eye", "keyboard", "fused"}
+
+
+class Session:
+    """One running control script: its mode, camera, screen region and cores."""
+
+    def __init__(self, name, mode, camera=None, region=None, cores=None):
+        self.name = name
+        self.mode = mode
+        self.camera = camera
+        self.region = region
+        self.requested_cores = cores
+        self.cores = []
+        self.proc: subprocess.Popen | None = None
+        self.started = None
+        self.state = "starting"
+        self.error = None
+        self.exit_code = None
+        self.cpu_percent = 0.0
+        self._ps = None
+
+    @property
+    def running(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def as_dict(self):
+        return {
+            "session": self.name,
+            "mode": self.mode,
+            "state": self.state,
+            "pid": self.proc.pid if self.proc is not None else None,
+            "camera": self.camera,
+            "region": list(self.region) if self.region else None,
+            "cores": self.cores,
+            "requested_cores": self.requested_cores,
+            "cpu_percent": round(self.cpu_percent, 1),
+            "started": self.started,
+            "exit_code": self.exit_code,
+            "error": self.error,
+        }
 
-current_mode = "none"
-current_proc: subprocess.Popen | None = None
 
+class CoreScheduler:
+    """
+    Splits a fixed budget of cores between the running sessions by CPU
+    affinity, so a busy tracker can't take the cores another session needs.
 
-def stop_current():
-    """Stop the currently running control script, if any."""
-    global current_proc, current_mode
+    Sessions that asked for specific cores get them (as far as they are in
+    the budget). The remaining idle cores are split evenly between everyone
+    else; when there are more sessions than idle cores, sessions double up
+    on the least-loaded core, one core each.
+    """
 
-    if current_proc is not None and current_proc.poll() is None:
-        print(f"Stopping current mode: {current_mode}, PID={current_proc.pid}")
+    def __init__(self, budget):
+        self.budget = list(budget)
+
+    def assign(self, sessions):
+        """Returns {session name: [core, ...]} for sessions in start order."""
+        load = {c: 0 for c in self.budget}
+        plan = {}
+        for s in sessions:
+            pinned = [c for c in (s.requested_cores or []) if c in load]
+            if pinned:
+                plan[s.name] = pinned
+                for c in pinned:
+                    load[c] += 1
+
+        auto = [s for s in sessions if s.name not in plan]
+        if not auto or not self.budget:
+            return plan
+
+        free = [c for c in self.budget if load[c] == 0]
+        if len(free) >= len(auto):
+            per, extra = divmod(len(free), len(auto))
+            i = 0
+            for n, s in enumerate(auto):
+                take = per + (1 if n < extra else 0)
+                plan[s.name] = free[i:i + take]
+                i += take
+            return plan
+
+        for s in auto:
+            core = min(load, key=lambda c: (load[c], c))
+            plan[s.name] = [core]
+            load[core] += 1
+        return plan
+
+
+def core_budget():
+    count = os.cpu_count() or 1
+    if psutil is not None:
         try:
-            current_proc.terminate()
+            available = sorted(psutil.Process().cpu_affinity())
+        except (AttributeError, OSError):
+            available = list(range(count))
+    else:
+        available = list(range(count))
+    # Keep at least one core for sessions even on a single-core box
+    keep = min(RESERVED_CORES, len(available) - 1)
+    return available[keep:] if keep > 0 else available
+
+
+sessions: dict[str, Session] = {}
+scheduler = CoreScheduler(core_budget())
+
+
+def set_affinity(session):
+    """Pin the session's process (and every thread it has started) to its cores."""
+    if psutil is None or not session.running or not session.cores:
+        return
+    try:
+        proc = psutil.Process(session.proc.pid)
+        proc.cpu_affinity(session.cores)
+        # On Linux the call above only covers the main thread
+        if hasattr(os, "sched_setaffinity"):
+            for thread in proc.threads():
+                try:
+                    os.sched_setaffinity(thread.id, session.cores)
+                except OSError:
+                    pass
+    except (AttributeError, psutil.Error, OSError) as e:
+        print(f"Could not set CPU affinity for session {session.name}:", e)
+
+
+def rebalance():
+    running = [s for s in sessions.values() if s.running]
+    plan = scheduler.assign(running)
+    for s in running:
+        cores = plan.get(s.name, [])
+        if cores != s.cores:
+            s.cores = cores
+            set_affinity(s)
+            print(f"Session {s.name}: cores {cores}")
+
+
+def stop_session(name):
+    """Stop the script for one session, if it is running."""
+    session = sessions.pop(name, None)
+    if session is None:
+        return
+    proc = session.proc
+    if proc is not None and proc.poll() is None:
+        print(f"Stopping session {name} ({session.mode}), PID={proc.pid}")
+        try:
+            proc.terminate()
             try:
-                current_proc.wait(timeout=5)
+                proc.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                current_proc.kill()
+                proc.kill()
         except Exception as e:
             print("Error stopping process:", e)
+        # Hand the freed cores to the sessions that are left
+        rebalance()
 
-    current_proc = None
-    current_mode = "none"
 
+def stop_all():
+    for name in list(sessions):
+        stop_session(name)
 
-def start_mode(mode: str):
-    """Start the script for the given mode, after stopping the old one."""
-    global current_proc, current_mode
 
-    # Stop any existing mode first
-    stop_current()
+def fail(session, message):
+    print(f"Session {session.name}: {message}")
+    session.state = "failed"
+    session.error = message
+    sessions[session.name] = session
+
+
+def start_session(name, mode, camera=None, region=None, cores=None):
+    """Start (or restart with new settings) the script for one session."""
+    stop_session(name)
 
     if mode == "none":
-        print("No mode requested (none).")
+        print(f"Session {name} stopped (mode none).")
         return
 
+    session = Session(name, mode, camera, region, cores)
     script_path = SCRIPTS.get(mode)
     if not script_path or not os.path.exists(script_path):
-        print(f"Script for mode '{mode}' not found at:", script_path)
+        fail(session, f"script for mode '{mode}' not found at {script_path}")
+        return
+
+    active = [s for s in sessions.values() if s.running]
+    if len(active) >= MAX_SESSIONS:
+        fail(session, f"session limit reached ({MAX_SESSIONS})")
         return
+    if mode in CAMERA_MODES:
+        if session.camera is None:
+            session.camera = 0
+        for other in active:
+            if other.mode in CAMERA_MODES and other.camera == session.camera:
+                fail(session, f"camera {session.camera} is already used by session {other.name}")
+                return
+
+    env = os.environ.copy()
+    env["VCH_SESSION"] = name
+    if session.camera is not None:
+        env["VCH_CAMERA_INDEX"] = str(session.camera)
+    if region:
+        env["VCH_DISPLAY_REGION"] = ",".join(str(v) for v in region)
+    # Keep numeric libraries from spawning a thread per host core
+    threads = str(len(cores) if cores else max(1, len(scheduler.budget) // (len(active) + 1)))
+    env.setdefault("OMP_NUM_THREADS", threads)
 
-    print(f"Starting mode: {mode}, script: {script_path}")
+    print(f"Starting session {name}: mode {mode}, script {script_path}")
     try:
         # Use same Python interpreter as app.py
-        proc = subprocess.Popen([sys.executable, script_path])
-        current_proc = proc
-        current_mode = mode
-        print(f"Started {mode} with PID={proc.pid}")
+        session.proc = subprocess.Popen([sys.executable, script_path], env=env)
     except Exception as e:
-        print(f"Failed to start mode {mode}: {e}")
+        fail(session, f"failed to start: {e}")
+        return
+    session.started = time.time()
+    session.state = "running"
+    sessions[name] = session
+    print(f"Started session {name} with PID={session.proc.pid}")
+    rebalance()
 
 
-def main_loop():
-    global current_mode
+def handle_command(cmd):
+    action = cmd.get("action")
+    if action is None:
+        # Legacy {"mode": ...}: one mode at a time, "none" stops everything
+        mode = cmd.get("mode", "none")
+        if mode == "none":
+            stop_all()
+        else:
+            start_session(DEFAULT_SESSION, mode)
+        return
+
+    name = cmd.get("session") or DEFAULT_SESSION
+    if action == "start":
+        region = parse_region(cmd["region"]) if cmd.get("region") else None
+        if cmd.get("region") and region is None:
+            print(f"Ignoring invalid region for session {name}:", cmd["region"])
+        start_session(name, cmd.get("mode", "none"), cmd.get("camera"), region, cmd.get("cores"))
+    elif action == "stop":
+        if cmd.get("session"):
+            stop_session(cmd["session"])
+        else:
+            stop_all()
+    else:
+        print("Unknown command:", cmd)
+
+
+def read_commands(last_cmd_time):
+    """Yield new commands from the legacy file and the command directory, oldest first."""
+    if os.path.exists(COMMAND_FILE):
+        with open(COMMAND_FILE, "r", encoding="utf-8") as f:
+            cmd = json.load(f)
+
+        # Remove file so we only process once
+        os.remove(COMMAND_FILE)
+
+        # Only handle newer commands
+        if cmd.get("time", 0) > last_cmd_time:
+            yield cmd
+
+    if os.path.isdir(COMMAND_DIR):
+        for fname in sorted(os.listdir(COMMAND_DIR)):
+            if not fname.endswith(".json"):
+                continue  # app.py writes *.tmp first and renames when complete
+            path = os.path.join(COMMAND_DIR, fname)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    cmd = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable command {fname}:", e)
+                cmd = None
+            os.remove(path)
+            if cmd is not None:
+                yield cmd
+
+
+def reap():
+    """Notice sessions whose script exited on its own (Esc pressed, crash)."""
+    changed = False
+    for s in sessions.values():
+        if s.state == "running" and not s.running:
+            s.state = "exited"
+            s.exit_code = s.proc.returncode
+            s.cores = []
+            changed = True
+            print(f"Session {s.name} exited with code {s.exit_code}")
+    if changed:
+        rebalance()
 
+
+def sample_cpu():
+    if psutil is None:
+        return
+    for s in sessions.values():
+        if not s.running:
+            s.cpu_percent = 0.0
+            continue
+        try:
+            if s._ps is None or s._ps.pid != s.proc.pid:
+                s._ps = psutil.Process(s.proc.pid)
+            s.cpu_percent = s._ps.cpu_percent(None)
+        except psutil.Error:
+            s.cpu_percent = 0.0
+
+
+def write_status():
+    status = {
+        "updated": time.time(),
+        "controller_pid": os.getpid(),
+        "core_budget": scheduler.budget,
+        "affinity": psutil is not None,
+        "sessions": {name: s.as_dict() for name, s in sessions.items()},
+    }
+    tmp = STATUS_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp, STATUS_FILE)
+
+
+def main_loop():
     print("control_service.py running. Waiting for commands...")
+    print(f"Core budget for sessions: {scheduler.budget}"
+          + ("" if psutil is not None else " (psutil not installed, affinity disabled)"))
+    os.makedirs(COMMAND_DIR, exist_ok=True)
 
     last_cmd_time = 0
+    last_status = 0
 
     while True:
         try:
-            if os.path.exists(COMMAND_FILE):
-                with open(COMMAND_FILE, "r", encoding="utf-8") as f:
-                    cmd = json.load(f)
-
-                # Remove file so we only process once
-                os.remove(COMMAND_FILE)
-
-                mode = cmd.get("mode", "none")
-                ts = cmd.get("time", 0)
+            for cmd in read_commands(last_cmd_time):
+                last_cmd_time = max(last_cmd_time, cmd.get("time", 0))
+                print("New command:", cmd)
+                handle_command(cmd)
+                last_status = 0  # publish the result straight away
+            reap()
 
-                # Only handle newer commands
-                if ts > last_cmd_time:
-                    last_cmd_time = ts
-                    print("New command:", cmd)
-                    start_mode(mode)
+            now = time.time()
+            if now - last_status >= 1.0:
+                sample_cpu()
+                write_status()
+                last_status = now
 
         except Exception as e:
             print("Error in control_service loop:", e)
@@ -100,5 +382,14 @@ def main_loop():
         time.sleep(0.3)
 
 
+def shutdown(*_):
+    raise SystemExit(0)
+
+
 if __name__ == "__main__":
-    main_loop()
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        main_loop()
+    finally:
+        stop_all()
+        write_status()
@@ -4,15 +4,21 @@ import pyautogui
 import numpy as np
 import time
 from collections import deque
+from profiling import get_tracer
+from session_env import camera_index, display_region
+
+tracer = get_tracer("eyecontrol")
 
 pyautogui.FAILSAFE = True
 
 # Camera & screen
-cam = cv2.VideoCapture(0)
+cam = cv2.VideoCapture(camera_index())
 cam_w, cam_h = 640, 480
 cam.set(3, cam_w)
 cam.set(4, cam_h)
 screen_w, screen_h = pyautogui.size()
+# A controller session may confine the cursor to part of the screen
+region_x, region_y, region_w, region_h = display_region(screen_w, screen_h)
 
 # Nose control area (visual box)
 track_w, track_h = 300, 200
@@ -61,19 +67,24 @@ warmup_done = False
 warmup_frames = 0
 
 while True:
-    ret, frame = cam.read()
+    frame_start = tracer.now()
+    with tracer.span("capture"):
+        ret, frame = cam.read()
     if not ret:
         break
-    frame = cv2.flip(frame, 1)
-    frame_h, frame_w = frame.shape[:2]
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = face_mesh.process(rgb)
+    with tracer.span("preprocess"):
+        frame = cv2.flip(frame, 1)
+        frame_h, frame_w = frame.shape[:2]
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    with tracer.span("inference"):
+        results = face_mesh.process(rgb)
 
     # Draw the visual box
     cv2.rectangle(frame, (track_x_start, track_y_start),
                   (track_x_start + track_w, track_y_start + track_h),
                   (0, 255, 255), 2)
 
+    classify_start = tracer.now()
     if results.multi_face_landmarks:
         landmarks = results.multi_face_landmarks[0].landmark
 
@@ -85,23 +96,24 @@ while True:
         # Only update cursor if nose is inside the control box
         if (track_x_start <= nose_x <= track_x_start + track_w) and \
            (track_y_start <= nose_y <= track_y_start + track_h):
-            # Map nose within box → entire screen
+            # Map nose within box → this session's screen region
             screen_x = int(np.interp(nose_x,
                                      [track_x_start, track_x_start + track_w],
-                                     [0, screen_w]))
+                                     [region_x, region_x + region_w]))
             screen_y = int(np.interp(nose_y,
                                      [track_y_start, track_y_start + track_h],
-                                     [0, screen_h]))
+                                     [region_y, region_y + region_h]))
 
             # Clamp values just in case
-            screen_x = int(np.clip(screen_x, 0, screen_w - 1))
-            screen_y = int(np.clip(screen_y, 0, screen_h - 1))
+            screen_x = int(np.clip(screen_x, region_x, region_x + region_w - 1))
+            screen_y = int(np.clip(screen_y, region_y, region_y + region_h - 1))
 
             # Smooth cursor movement
             cursor_history.append((screen_x, screen_y))
             avg_x = int(np.mean([c[0] for c in cursor_history]))
             avg_y = int(np.mean([c[1] for c in cursor_history]))
-            pyautogui.moveTo(avg_x, avg_y)
+            with tracer.span("inject"):
+                pyautogui.moveTo(avg_x, avg_y)
 
         # Draw nose point
         cv2.circle(frame, (nose_x, nose_y), 5, (0, 255, 0), -1)
@@ -130,7 +142,8 @@ while True:
                 left_eye_blink_counter = 0
 
             if left_eye_blink_counter >= CONSEC_FRAMES_TO_BLINK and (current_time - last_click_time) > blink_cooldown:
-                pyautogui.click(button='left')
+                with tracer.span("inject"):
+                    pyautogui.click(button='left')
                 last_click_time = current_time
                 left_eye_blink_counter = 0
                 if DEBUG:
@@ -147,9 +160,14 @@ while True:
     else:
         cv2.putText(frame, "No face detected", (10, 30),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-
-    cv2.imshow("Eye Controlled Mouse", frame)
-    if cv2.waitKey(1) & 0xFF == 27:
+    tracer.record("classify", classify_start)
+    tracer.counter("face_detected", 1 if results.multi_face_landmarks else 0)
+
+    with tracer.span("render"):
+        cv2.imshow("Eye Controlled Mouse", frame)
+        key = cv2.waitKey(1) & 0xFF
+    tracer.record("frame", frame_start)
+    if key == 27:
         break
 
 cam.release()
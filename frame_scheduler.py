@@ -0,0 +1,189 @@
+"""
+Runs two vision models (hand landmarks every frame, face mesh as often
+as the frame budget allows) over the same preprocessed image.
+
+Three strategies, picked from measured latencies and re-checked every
+`reevaluate_frames` frames:
+
+    serial      both models on the capture thread, every frame
+                (used whenever hand + face + overhead fits the budget)
+    async       the face model runs on a worker thread on the newest frame
+                while the hand model keeps running every frame; each face
+                result is picked up on the frame after it finishes
+                (needs a second core; MediaPipe releases the GIL)
+    interleave  one core and no room for both: every Nth frame goes to
+                the face model alone (N keeps faces at min_face_hz), the
+                rest to the hand model, whose last result is reused on
+                face frames
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from profiling import get_tracer
+
+SERIAL = "serial"
+ASYNC = "async"
+INTERLEAVE = "interleave"
+
+tracer = get_tracer()
+
+
+def usable_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ModelScheduler:
+    def __init__(self, budget_ms=33.0, fps=30.0, min_face_hz=8.0, allow_async=None,
+                 reevaluate_frames=30, alpha=0.1, margin=0.9):
+        self.budget_ms = budget_ms
+        self.fps = fps
+        self.min_face_hz = min_face_hz
+        # Pinned to one core (see control_service.CoreScheduler) a worker thread only adds contention
+        self.allow_async = usable_cores() >= 2 if allow_async is None else allow_async
+        self.reevaluate_frames = reevaluate_frames
+        self.alpha = alpha
+        # Plan for 90% of the budget so jitter doesn't push every frame over
+        self.margin = margin
+
+        self.hand_ms = None
+        self.face_ms = None
+        self.overhead_ms = 0.0
+        self.mode = SERIAL
+        self.face_interval = 1
+        self._since_face = 0
+        self._since_eval = 0
+
+    def _ema(self, old, new):
+        return new if old is None else old + self.alpha * (new - old)
+
+    def observe(self, hand_ms=None, face_ms=None):
+        """Feed back measured model latencies."""
+        if hand_ms is not None:
+            self.hand_ms = self._ema(self.hand_ms, hand_ms)
+        if face_ms is not None:
+            self.face_ms = self._ema(self.face_ms, face_ms)
+
+    def end_frame(self, frame_ms, main_thread_ms=0.0):
+        """
+        Feed back the whole loop iteration. Everything but inference on the
+        capture thread (capture, preprocess, drawing, display) is overhead.
+        """
+        self.overhead_ms = self._ema(self.overhead_ms, max(0.0, frame_ms - main_thread_ms))
+        self._since_eval += 1
+        if self._since_eval >= self.reevaluate_frames and self.hand_ms is not None and self.face_ms is not None:
+            self._since_eval = 0
+            self._choose()
+
+    def _choose(self):
+        budget = self.budget_ms * self.margin
+        if self.hand_ms + self.face_ms + self.overhead_ms <= budget:
+            mode, interval = SERIAL, 1
+        elif self.allow_async:
+            mode, interval = ASYNC, 1
+        else:
+            mode, interval = INTERLEAVE, max(2, int(self.fps / self.min_face_hz))
+        if (mode, interval) != (self.mode, self.face_interval):
+            print(f"Frame scheduler: {mode}" + (f" (face every {interval} frames)" if mode == INTERLEAVE else "")
+                  + f" - hand {self.hand_ms:.1f} ms, face {self.face_ms:.1f} ms, other {self.overhead_ms:.1f} ms")
+            self.mode, self.face_interval = mode, interval
+            tracer.instant("scheduler", {"mode": mode, "face_interval": interval})
+
+    def face_due(self):
+        """Whether the face model should run on this frame (serial / interleave)."""
+        if self.mode == SERIAL or self.face_ms is None:
+            return True
+        self._since_face += 1
+        if self._since_face >= self.face_interval:
+            self._since_face = 0
+            return True
+        return False
+
+
+class FusedRunner:
+    """
+    Applies a ModelScheduler to a pair of model callables taking the same image.
+
+    run(image) returns (hand_result, face_result, face_time): face_result is
+    None on frames where no new face result is available, and face_time is
+    the capture time of the frame the face result belongs to. On interleaved
+    face frames hand_result is the previous frame's.
+    """
+
+    def __init__(self, hand_fn, face_fn, scheduler=None):
+        self.hand_fn = hand_fn
+        self.face_fn = face_fn
+        self.scheduler = scheduler or ModelScheduler()
+        self._pool = None
+        self._pending = None
+        self._main_ms = 0.0
+        self._last_hand = None
+
+    def _face_job(self, image, captured):
+        start = tracer.now()
+        t0 = time.perf_counter()
+        result = self.face_fn(image)
+        face_ms = (time.perf_counter() - t0) * 1000
+        tracer.record("face_inference", start)
+        return result, face_ms, captured
+
+    def _hand(self, image):
+        start = tracer.now()
+        t0 = time.perf_counter()
+        result = self.hand_fn(image)
+        hand_ms = (time.perf_counter() - t0) * 1000
+        tracer.record("hand_inference", start)
+        return result, hand_ms
+
+    def run(self, image, captured=None):
+        captured = time.time() if captured is None else captured
+        sched = self.scheduler
+
+        if sched.mode == ASYNC:
+            face = face_ms = face_time = None
+            if self._pending is not None and self._pending.done():
+                face, face_ms, face_time = self._pending.result()
+                self._pending = None
+            if self._pending is None:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="face-model")
+                # The image is never written to after preprocessing, so the worker can share it
+                self._pending = self._pool.submit(self._face_job, image, captured)
+            hand, hand_ms = self._hand(image)
+            self._last_hand = hand
+            self._main_ms = hand_ms
+            sched.observe(hand_ms=hand_ms, face_ms=face_ms)
+            return hand, face, face_time
+
+        self._drain()
+        face = face_ms = face_time = hand_ms = None
+        face_due = sched.face_due()
+        if face_due:
+            face, face_ms, face_time = self._face_job(image, captured)
+        if face_due and sched.mode == INTERLEAVE:
+            hand = self._last_hand
+        else:
+            hand, hand_ms = self._hand(image)
+            self._last_hand = hand
+        self._main_ms = (hand_ms or 0.0) + (face_ms or 0.0)
+        sched.observe(hand_ms=hand_ms, face_ms=face_ms)
+        return hand, face, face_time
+
+    def end_frame(self, frame_ms):
+        """Report the full loop time so the scheduler can account for capture and display."""
+        self.scheduler.end_frame(frame_ms, self._main_ms)
+
+    def _drain(self):
+        """Finish an in-flight async face job before switching back to this thread."""
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+
+    def close(self):
+        self._drain()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
@@ -0,0 +1,222 @@
+import os
+import time
+from collections import deque
+
+import cv2
+import mediapipe as mp
+import mouse
+import numpy as np
+import pyautogui  # for screen size
+
+from frame_scheduler import FusedRunner, ModelScheduler
+from profiling import get_tracer
+from session_env import SESSION_NAME, camera_index, display_region
+
+# Hand + face in one process: the hand moves the cursor, winks click.
+# One capture, one flip and one BGR->RGB conversion feed both models.
+
+tracer = get_tracer("fusedcontrol")
+
+FRAME_BUDGET_MS = float(os.getenv("VCH_FRAME_BUDGET_MS", "33"))
+MIN_FACE_HZ = float(os.getenv("VCH_MIN_FACE_HZ", "8"))
+
+# Camera & screen
+cam_w, cam_h = 640, 480
+frameR = 100          # hand control box margin, as in AImouse.py
+smoothening = 5
+
+LEFT_EYE_IDX = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE_IDX = [362, 385, 387, 263, 373, 380]
+INDEX_TIP, INDEX_PIP, MIDDLE_TIP, MIDDLE_PIP = 8, 6, 12, 10
+
+DEBUG = True
+
+
+def calculate_EAR(landmarks, idx):
+    p = [np.array([landmarks[i].x, landmarks[i].y]) for i in idx]
+    A = np.linalg.norm(p[1] - p[5])
+    B = np.linalg.norm(p[2] - p[4])
+    C = np.linalg.norm(p[0] - p[3])
+    if C == 0:
+        return 0.0
+    return (A + B) / (2.0 * C)
+
+
+class WinkDetector:
+    """
+    Left wink -> left click, right wink -> right click. Ordinary blinks
+    (both eyes shut) are ignored, so looking around while steering with
+    the hand doesn't click.
+
+    Timing uses the capture time of the frame each face result came from,
+    not a frame count, because face results arrive at whatever rate the
+    frame scheduler allows (every frame, every Nth, or asynchronously).
+    """
+
+    def __init__(self, min_closed=0.12, cooldown=0.8, calibration_seconds=1.5,
+                 factor=0.75, floor=0.15):
+        self.min_closed = min_closed
+        self.cooldown = cooldown
+        self.calibration_seconds = calibration_seconds
+        self.factor = factor
+        self.floor = floor
+
+        self.baseline = {"left": deque(maxlen=90), "right": deque(maxlen=90)}
+        self.closed_since = {"left": None, "right": None}
+        self.fired = {"left": False, "right": False}
+        self.calibration_start = None
+        self.last_seen = None
+        self.last_click = 0.0
+
+    @property
+    def calibrated(self):
+        return self.calibration_start is not None and all(self.baseline.values()) and \
+            self.last_seen - self.calibration_start >= self.calibration_seconds
+
+    def threshold(self, side):
+        buf = self.baseline[side]
+        if not buf:
+            return 0.2
+        return max(self.floor, self.factor * float(np.median(buf)))
+
+    def update(self, left_ear, right_ear, ts):
+        """Returns "left", "right" or None."""
+        ears = {"left": left_ear, "right": right_ear}
+        if self.calibration_start is None:
+            self.calibration_start = ts
+        self.last_seen = ts
+        if not self.calibrated:
+            for side, ear in ears.items():
+                self.baseline[side].append(ear)
+            return None
+
+        closed = {side: ear < self.threshold(side) for side, ear in ears.items()}
+        if not any(closed.values()):
+            # Both open: keep the baseline following lighting and head pose
+            for side, ear in ears.items():
+                self.baseline[side].append(ear)
+
+        click = None
+        for side, other in (("left", "right"), ("right", "left")):
+            if closed[side] and not closed[other]:
+                if self.closed_since[side] is None:
+                    self.closed_since[side] = ts
+                if (not self.fired[side] and ts - self.closed_since[side] >= self.min_closed
+                        and ts - self.last_click >= self.cooldown):
+                    self.fired[side] = True
+                    self.last_click = ts
+                    click = side
+            else:
+                self.closed_since[side] = None
+                self.fired[side] = False
+        return click
+
+
+def main():
+    screen_w, screen_h = pyautogui.size()
+    region_x, region_y, region_w, region_h = display_region(screen_w, screen_h)
+
+    cap = cv2.VideoCapture(camera_index())
+    cap.set(3, cam_w)
+    cap.set(4, cam_h)
+
+    hands = mp.solutions.hands.Hands(max_num_hands=1, model_complexity=0,
+                                     min_detection_confidence=0.8, min_tracking_confidence=0.5)
+    face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=False)
+    scheduler = ModelScheduler(budget_ms=FRAME_BUDGET_MS, min_face_hz=MIN_FACE_HZ)
+    runner = FusedRunner(hands.process, face_mesh.process, scheduler)
+    winks = WinkDetector()
+
+    window = "Fused Control" if SESSION_NAME == "default" else f"Fused Control ({SESSION_NAME})"
+    prev_x, prev_y = region_x, region_y
+    face_seen = False
+    last_wink = None
+    last_wink_time = 0.0
+
+    try:
+        while True:
+            frame_start = tracer.now()
+            t0 = time.perf_counter()
+            with tracer.span("capture"):
+                success, frame = cap.read()
+            if not success:
+                break
+            captured = time.time()
+            with tracer.span("preprocess"):
+                frame = cv2.flip(frame, 1)
+                frame_h, frame_w = frame.shape[:2]
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Lets MediaPipe use the buffer without copying; both models read the same one
+                rgb.flags.writeable = False
+
+            hand_result, face_result, face_time = runner.run(rgb, captured)
+
+            classify_start = tracer.now()
+            cv2.rectangle(frame, (frameR, frameR), (cam_w - frameR, cam_h - frameR), (255, 0, 255), 2)
+
+            # Cursor: index finger up, middle finger down
+            if hand_result is not None and hand_result.multi_hand_landmarks:
+                lm = hand_result.multi_hand_landmarks[0].landmark
+                ind_x, ind_y = int(lm[INDEX_TIP].x * frame_w), int(lm[INDEX_TIP].y * frame_h)
+                cv2.circle(frame, (ind_x, ind_y), 5, (0, 255, 0), 2)
+                index_up = lm[INDEX_TIP].y < lm[INDEX_PIP].y
+                middle_up = lm[MIDDLE_TIP].y < lm[MIDDLE_PIP].y
+                if index_up and not middle_up:
+                    curr_x = np.interp(ind_x, (frameR, cam_w - frameR), (region_x, region_x + region_w - 1))
+                    curr_y = np.interp(ind_y, (frameR, cam_h - frameR), (region_y, region_y + region_h - 1))
+                    final_x = prev_x + (curr_x - prev_x) / smoothening
+                    final_y = prev_y + (curr_y - prev_y) / smoothening
+                    with tracer.span("inject"):
+                        mouse.move(int(final_x), int(final_y))
+                    prev_x, prev_y = final_x, final_y
+
+            # Clicks: winks, timed by the capture time of the face frame
+            if face_result is not None:
+                face_seen = bool(face_result.multi_face_landmarks)
+                if face_seen:
+                    landmarks = face_result.multi_face_landmarks[0].landmark
+                    left_ear = calculate_EAR(landmarks, LEFT_EYE_IDX)
+                    right_ear = calculate_EAR(landmarks, RIGHT_EYE_IDX)
+                    side = winks.update(left_ear, right_ear, face_time)
+                    if side:
+                        with tracer.span("inject"):
+                            mouse.click(button=side)
+                        last_wink, last_wink_time = side, time.time()
+                        if DEBUG:
+                            print(f"{side.capitalize()} wink - click:", time.strftime("%H:%M:%S"))
+                    if DEBUG:
+                        cv2.putText(frame, f"EAR L {left_ear:.3f} R {right_ear:.3f}", (10, 60),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 0), 2)
+            tracer.record("classify", classify_start)
+            tracer.counter("hand_detected", 1 if hand_result is not None and hand_result.multi_hand_landmarks else 0)
+            tracer.counter("face_detected", 1 if face_seen else 0)
+
+            if not winks.calibrated:
+                cv2.putText(frame, "Calibrating - keep both eyes open", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 165, 0), 2)
+            elif not face_seen:
+                cv2.putText(frame, "No face detected", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            if last_wink and time.time() - last_wink_time < 0.5:
+                cv2.putText(frame, f"{last_wink.upper()} CLICK", (10, 120),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            if DEBUG:
+                mode = scheduler.mode + (f" 1/{scheduler.face_interval}" if scheduler.face_interval > 1 else "")
+                cv2.putText(frame, f"Scheduler: {mode}", (10, frame_h - 15),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+            with tracer.span("render"):
+                cv2.imshow(window, frame)
+                key = cv2.waitKey(1) & 0xFF
+            runner.end_frame((time.perf_counter() - t0) * 1000)
+            tracer.record("frame", frame_start)
+            if key == 27:
+                break
+    finally:
+        runner.close()
+        cap.release()
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Lightweight tracing for the control loops.
+
+Enable by pointing VCH_TRACE at a file (use {pid} and {name} to get one
+file per process), then open it in https://ui.perfetto.dev or
+chrome://tracing:
+
+    VCH_TRACE=traces/{name}-{pid}.json python AImouse.py
+
+Sampled stack profiling starts with VCH_TRACE_SAMPLE=1, or is toggled at
+runtime with SIGUSR1 (SIGBREAK / Ctrl+Break on Windows).
+
+Events are streamed in Chrome's JSON array format and flushed every
+second, so a trace survives the process being killed.
+
+    python profiling.py summary trace.json    # per-span stats + hottest stacks
+"""
+import argparse
+import atexit
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+TRACE_ENV = "VCH_TRACE"
+SAMPLE_ENV = "VCH_TRACE_SAMPLE"
+SAMPLE_INTERVAL = 0.01
+FLUSH_INTERVAL = 1.0
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """Returned when tracing is off; every call is a no-op."""
+
+    enabled = False
+
+    def span(self, name, cat="loop"):
+        return _NULL_SPAN
+
+    def now(self):
+        return 0
+
+    def record(self, name, start, cat="loop"):
+        pass
+
+    def counter(self, name, value):
+        pass
+
+    def instant(self, name, args=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "t0")
+
+    def __init__(self, tracer, name, cat):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.t0, self.cat)
+        return False
+
+
+class Tracer:
+    enabled = True
+
+    def __init__(self, path, process_name, sample_interval=SAMPLE_INTERVAL):
+        self.path = path
+        self.pid = os.getpid()
+        self.sample_interval = sample_interval
+        self._origin = time.perf_counter_ns()
+        self._events = deque()  # append/popleft are thread-safe without a lock
+        self._lock = threading.Lock()
+        self._closed = False
+        self._sampling = threading.Event()
+        self._stop = threading.Event()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._emit({"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                    "args": {"name": process_name}})
+
+        self._writer = threading.Thread(target=self._flush_loop, name="trace-writer", daemon=True)
+        self._writer.start()
+        self._sampler = threading.Thread(target=self._sample_loop, name="trace-sampler", daemon=True)
+        self._sampler.start()
+        atexit.register(self.close)
+
+    # -------------------- Recording --------------------
+    def span(self, name, cat="loop"):
+        return _Span(self, name, cat)
+
+    def now(self):
+        return time.perf_counter_ns()
+
+    def record(self, name, start, cat="loop"):
+        """Record a complete event from `start` (a value from now()) until now."""
+        end = time.perf_counter_ns()
+        # Plain tuple append keeps the hot path to well under a microsecond
+        self._events.append((name, cat, start, end, threading.get_ident()))
+
+    def counter(self, name, value):
+        self._emit({"name": name, "ph": "C", "ts": self._ts(time.perf_counter_ns()),
+                    "pid": self.pid, "args": {name: value}})
+
+    def instant(self, name, args=None):
+        self._emit({"name": name, "ph": "i", "s": "t", "ts": self._ts(time.perf_counter_ns()),
+                    "pid": self.pid, "tid": threading.get_ident(), "args": args or {}})
+
+    # -------------------- Stack sampling --------------------
+    def start_sampling(self):
+        self._sampling.set()
+        self.instant("sampling started")
+
+    def stop_sampling(self):
+        self._sampling.clear()
+        self.instant("sampling stopped")
+
+    def toggle_sampling(self, *_):
+        if self._sampling.is_set():
+            self.stop_sampling()
+        else:
+            self.start_sampling()
+
+    def _sample_loop(self):
+        own = {threading.get_ident(), self._writer.ident}
+        while not self._stop.is_set():
+            if not self._sampling.wait(0.5):
+                continue
+            ts = self._ts(time.perf_counter_ns())
+            for tid, frame in sys._current_frames().items():
+                if tid in own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.reverse()
+                self._emit({"name": stack[-1] if stack else "?", "cat": "sample", "ph": "i", "s": "t",
+                            "ts": ts, "pid": self.pid, "tid": tid, "args": {"stack": stack}})
+            time.sleep(self.sample_interval)
+
+    # -------------------- Output --------------------
+    def _ts(self, ns):
+        return (ns - self._origin) / 1000.0
+
+    def _emit(self, event):
+        self._events.append(event)
+
+    def _flush_loop(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._closed:
+                return
+            lines = []
+            for _ in range(len(self._events)):
+                ev = self._events.popleft()
+                if isinstance(ev, tuple):
+                    name, cat, start, end, tid = ev
+                    ev = {"name": name, "cat": cat, "ph": "X", "ts": self._ts(start),
+                          "dur": (end - start) / 1000.0, "pid": self.pid, "tid": tid}
+                lines.append(json.dumps(ev, separators=(",", ":")) + ",\n")
+            if not lines:
+                return
+            self._file.write("".join(lines))
+            self._file.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._stop.set()
+        self._sampling.clear()
+        self.flush()
+        with self._lock:
+            self._closed = True
+            # Terminate the array; viewers also accept it without this if we get killed
+            self._file.write('{"name":"trace end","ph":"i","s":"g","ts":%.3f,"pid":%d}\n]\n'
+                             % (self._ts(time.perf_counter_ns()), self.pid))
+            self._file.close()
+
+
+_tracer = None
+
+
+def get_tracer(process_name=None):
+    """The process-wide tracer: a Tracer when VCH_TRACE is set, otherwise a NullTracer."""
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+
+    path = os.getenv(TRACE_ENV, "").strip()
+    if not path:
+        _tracer = NullTracer()
+        return _tracer
+
+    name = process_name or os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+    _tracer = Tracer(path.format(pid=os.getpid(), name=name), name)
+    if os.getenv(SAMPLE_ENV) == "1":
+        _tracer.start_sampling()
+
+    sig = getattr(signal, "SIGUSR1", None) or getattr(signal, "SIGBREAK", None)
+    if sig is not None and threading.current_thread() is threading.main_thread():
+        signal.signal(sig, _tracer.toggle_sampling)
+    return _tracer
+
+
+# -------------------- Offline summary --------------------
+def load_events(path):
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read().rstrip().rstrip(",")
+    if not text.endswith("]"):
+        text += "]"
+    data = json.loads(text)
+    return data["traceEvents"] if isinstance(data, dict) else data
+
+
+def summarize(path, top=15):
+    events = load_events(path)
+    spans = defaultdict(list)
+    stacks = Counter()
+    first = last = None
+    for ev in events:
+        if "ts" in ev:
+            first = ev["ts"] if first is None else min(first, ev["ts"])
+            last = ev["ts"] if last is None else max(last, ev["ts"] + ev.get("dur", 0))
+        if ev.get("ph") == "X":
+            spans[ev["name"]].append(ev["dur"])
+        elif ev.get("cat") == "sample":
+            stacks[" > ".join(ev["args"]["stack"][-4:])] += 1
+
+    wall = (last - first) if first is not None else 0
+    print(f"{path}: {wall / 1e6:.1f}s traced")
+    print(f"{'span':<16} {'count':>7} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'% wall':>7}")
+    for name, durs in sorted(spans.items(), key=lambda kv: -sum(kv[1])):
+        durs.sort()
+        print(f"{name:<16} {len(durs):>7} {sum(durs) / len(durs) / 1000:>9.2f} "
+              f"{durs[int(0.95 * (len(durs) - 1))] / 1000:>9.2f} {durs[-1] / 1000:>9.2f} "
+              f"{100 * sum(durs) / wall if wall else 0:>6.1f}%")
+    if stacks:
+        total = sum(stacks.values())
+        print(f"\nHottest sampled stacks ({total} samples):")
+        for stack, n in stacks.most_common(top):
+            print(f"{100 * n / total:5.1f}%  {stack}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a VCH_TRACE file.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("summary")
+    s.add_argument("trace")
+    s.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    if args.cmd == "summary":
+        summarize(args.trace, args.top)
+
+
+if __name__ == "__main__":
+    main()
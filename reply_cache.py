@@ -0,0 +1,130 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Words that usually point back at earlier turns ("how do I stop it?")
+FOLLOW_UP_WORDS = {
+    "it", "that", "this", "those", "these", "them", "they", "he", "she", "his", "her", "its",
+    "above", "previous", "earlier", "again", "more", "else", "same", "last", "instead",
+}
+FOLLOW_UP_PREFIXES = ("and ", "but ", "so ", "also ", "what about", "how about", "then ")
+
+
+def normalize_message(text: str) -> str:
+    """Lower-case, drop punctuation and collapse whitespace so trivial variants share a key."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def is_context_dependent(normalized: str, history) -> bool:
+    """
+    True when the answer probably depends on the conversation so far,
+    in which case a cached reply to the same words could be wrong.
+    """
+    if not history:
+        return False
+    words = normalized.split()
+    if len(words) <= 2:
+        return True
+    if normalized.startswith(FOLLOW_UP_PREFIXES):
+        return True
+    return any(w in FOLLOW_UP_WORDS for w in words)
+
+
+class ReplyCache:
+    """
+    LRU + TTL cache of chat replies keyed on the normalized message and a
+    context fingerprint (model, prompt version, ...).
+
+    scope="global" shares answers between users, scope="user" keeps a
+    separate cache space per user. A shared entry must not carry anything
+    from one user's conversation, so in global scope only replies
+    generated from an empty history are stored.
+    """
+
+    def __init__(self, enabled=True, scope="global", ttl=3600, max_entries=1000):
+        if scope not in ("global", "user"):
+            raise ValueError(f"Unknown reply cache scope: {scope}")
+        self.enabled = enabled
+        self.scope = scope
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # key -> (expires_at, reply)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, message, user_id=None, context=""):
+        owner = str(user_id) if self.scope == "user" else "*"
+        raw = "\0".join([owner, context, normalize_message(message)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, reply):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, reply)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_generate(self, message, history, generate, user_id=None, context=""):
+        """Return a cached reply, or call `generate()` and cache its result."""
+        if not self.enabled:
+            return generate()
+        if is_context_dependent(normalize_message(message), history):
+            with self._lock:
+                self.bypasses += 1
+            return generate()
+
+        key = self.make_key(message, user_id, context)
+        reply = self.get(key)
+        if reply is None:
+            reply = generate()
+            if self.scope == "user" or not history:
+                self.put(key, reply)
+        return reply
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "scope": self.scope,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
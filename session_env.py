@@ -0,0 +1,52 @@
+"""
+Per-session settings handed to the control scripts by control_service.py.
+
+Each session runs its script with:
+    VCH_SESSION         session name ("default" for the classic single mode)
+    VCH_CAMERA_INDEX    OpenCV camera index
+    VCH_DISPLAY_REGION  "x,y,w,h" screen area the session's cursor is confined to
+
+Scripts started by hand (no controller) fall back to camera 0 and the full screen.
+"""
+import os
+
+SESSION_NAME = os.getenv("VCH_SESSION", "default")
+
+
+def camera_index(default=0):
+    value = os.getenv("VCH_CAMERA_INDEX", "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring invalid VCH_CAMERA_INDEX={value!r}, using camera {default}")
+        return default
+
+
+def parse_region(value):
+    """'x,y,w,h' (or a 4-item list) -> (x, y, w, h) ints, or None if invalid."""
+    if isinstance(value, str):
+        value = value.replace(" ", "").split(",")
+    try:
+        x, y, w, h = (int(v) for v in value)
+    except (TypeError, ValueError):
+        return None
+    if x < 0 or y < 0 or w <= 0 or h <= 0:
+        return None
+    return x, y, w, h
+
+
+def display_region(screen_w, screen_h):
+    """The screen area for this session, clipped to the actual screen."""
+    value = os.getenv("VCH_DISPLAY_REGION", "").strip()
+    region = parse_region(value) if value else None
+    if value and region is None:
+        print(f"Ignoring invalid VCH_DISPLAY_REGION={value!r}, using the full screen")
+    if region is None:
+        return 0, 0, screen_w, screen_h
+
+    x, y, w, h = region
+    x = min(x, screen_w - 1)
+    y = min(y, screen_h - 1)
+    return x, y, min(w, screen_w - x), min(h, screen_h - y)
@@ -0,0 +1,210 @@
+import itertools
+import threading
+import time
+
+PRIORITY_HIGH = 0     # errors, goodbye: survive barge-in
+PRIORITY_NORMAL = 1   # command feedback
+PRIORITY_LOW = 2      # chatter that can be dropped freely
+
+
+# -------------------- Backends --------------------
+class NullBackend:
+    """Records what would have been said. Used in tests and when no TTS is available."""
+
+    def __init__(self, seconds_per_char=0.0):
+        self.seconds_per_char = seconds_per_char
+        self.spoken = []
+        self.beeps = 0
+
+    def open(self):
+        pass
+
+    def say(self, text, cancel):
+        self.spoken.append(text)
+        end = time.monotonic() + self.seconds_per_char * len(text)
+        while time.monotonic() < end and not cancel.is_set():
+            time.sleep(0.005)
+
+    def beep(self, freq, ms):
+        self.beeps += 1
+
+    def close(self):
+        pass
+
+
+class Pyttsx3Backend:
+    """
+    pyttsx3 driven with its external event loop, so playback can be
+    stopped between iterations. The engine is created on the worker thread
+    because SAPI/NSSS engines must be used from the thread that made them.
+    """
+
+    def __init__(self, rate=160):
+        self.rate = rate
+        self.engine = None
+
+    def open(self):
+        import pyttsx3
+
+        self.engine = pyttsx3.init()
+        self.engine.setProperty("rate", self.rate)
+
+    def say(self, text, cancel):
+        self.engine.say(text)
+        self.engine.startLoop(False)
+        try:
+            while self.engine.isBusy() and not cancel.is_set():
+                self.engine.iterate()
+                time.sleep(0.01)
+            if cancel.is_set():
+                self.engine.stop()
+        finally:
+            self.engine.endLoop()
+
+    def beep(self, freq, ms):
+        try:
+            import winsound
+            winsound.Beep(freq, ms)
+        except ImportError:
+            pass
+
+    def close(self):
+        self.engine = None
+
+
+# -------------------- Speech queue --------------------
+class SpeechQueue:
+    """
+    Speaks messages on a worker thread so callers (the listen loop) never
+    block on audio output.
+
+    - Lower priority numbers are spoken first; equal priorities keep order.
+    - A message with a `key` replaces any queued message with the same key.
+    - `barge_in()` stops the current message and drops everything queued
+      below PRIORITY_HIGH, for when the user starts talking over us.
+    """
+
+    def __init__(self, backend, on_speaking=None):
+        self.backend = backend
+        # Called with True/False when playback starts/stops, e.g. to desensitize the VAD
+        self.on_speaking = on_speaking
+
+        self._items = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._cancel = threading.Event()
+        self._current = None
+        self._closed = False
+
+        self.spoken = 0
+        self.merged = 0
+        self.interrupted = 0
+
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="speech-output", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    @property
+    def is_speaking(self):
+        return self._current is not None
+
+    def say(self, text, priority=PRIORITY_NORMAL, key=None, interrupt=False):
+        with self._cond:
+            if self._closed:
+                return
+            before = len(self._items)
+            self._items = [
+                it for it in self._items
+                if not ((key is not None and it["key"] == key) or it["text"] == text)
+            ]
+            self.merged += before - len(self._items)
+            self._items.append({"kind": "say", "text": text, "priority": priority,
+                                "key": key, "seq": next(self._seq)})
+            if interrupt:
+                self._cancel.set()
+            self._cond.notify()
+
+    def beep(self, freq=1000, ms=100):
+        with self._cond:
+            if self._closed:
+                return
+            self._items.append({"kind": "beep", "text": None, "priority": PRIORITY_HIGH,
+                                "key": "beep", "seq": next(self._seq), "freq": freq, "ms": ms})
+            self._cond.notify()
+
+    def barge_in(self):
+        """The user started speaking: stop talking and forget non-urgent messages."""
+        with self._cond:
+            self._items = [it for it in self._items if it["priority"] <= PRIORITY_HIGH and it["kind"] == "say"]
+            if self._current is not None and self._current["priority"] > PRIORITY_HIGH:
+                self._cancel.set()
+                self.interrupted += 1
+
+    def wait_idle(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._items or self._current is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.1)
+            return True
+
+    def close(self, drain=True, timeout=10):
+        if drain:
+            self.wait_idle(timeout)
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._cancel.set()
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _next(self):
+        with self._cond:
+            while not self._items and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return None
+            item = min(self._items, key=lambda it: (it["priority"], it["seq"]))
+            self._items.remove(item)
+            self._current = item
+            self._cancel.clear()
+            return item
+
+    def _run(self):
+        try:
+            self.backend.open()
+        except Exception as e:
+            print("TTS failed, running without voice:", e)
+            self.backend = NullBackend()
+        self._ready.set()
+
+        while True:
+            item = self._next()
+            if item is None:
+                break
+            try:
+                if item["kind"] == "beep":
+                    self.backend.beep(item["freq"], item["ms"])
+                else:
+                    self._set_speaking(True)
+                    self.backend.say(item["text"], self._cancel)
+                    self.spoken += 1
+            except Exception as e:
+                print("TTS error:", e)
+            finally:
+                if item["kind"] == "say":
+                    self._set_speaking(False)
+                with self._cond:
+                    self._current = None
+                    self._cond.notify_all()
+        self.backend.close()
+
+    def _set_speaking(self, speaking):
+        if self.on_speaking:
+            try:
+                self.on_speaking(speaking)
+            except Exception as e:
+                print("Speech state listener failed:", e)
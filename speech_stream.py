@@ -0,0 +1,396 @@
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+
+from profiling import get_tracer
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Download from https://alphacephei.com/vosk/models and unpack here, or set VOSK_MODEL_PATH
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", os.path.join(BASE_DIR, "models", "vosk-model-small-en-us-0.15"))
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+tracer = get_tracer()
+
+
+def frame_rms(frame: bytes) -> float:
+    samples = array("h", frame)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+# -------------------- Audio ring buffer --------------------
+class AudioRingBuffer:
+    """
+    Fixed-size FIFO of audio frames between the capture callback and the
+    recognizer thread. When the consumer falls behind, the oldest audio is
+    dropped instead of blocking the audio callback.
+    """
+
+    def __init__(self, capacity_frames):
+        self._frames = deque(maxlen=capacity_frames)
+        self._cond = threading.Condition()
+        self.overruns = 0
+
+    def push(self, frame):
+        with self._cond:
+            if len(self._frames) == self._frames.maxlen:
+                self.overruns += 1
+            self._frames.append(frame)
+            self._cond.notify()
+
+    def pop(self, timeout=None):
+        with self._cond:
+            if not self._frames:
+                self._cond.wait(timeout)
+            return self._frames.popleft() if self._frames else None
+
+    def clear(self):
+        with self._cond:
+            self._frames.clear()
+
+    def __len__(self):
+        return len(self._frames)
+
+
+# -------------------- Voice activity detection --------------------
+class EnergyVAD:
+    """
+    Energy-based voice activity detector with a running ambient-noise
+    estimate. The noise level is tracked continuously from non-speech
+    frames, so a fan switching on doesn't need a fresh calibration pass.
+    """
+
+    def __init__(self, start_ratio=3.0, stop_ratio=2.0, min_level=150.0, noise_alpha=0.05,
+                 start_frames=3, hangover_frames=20, max_speech_frames=250):
+        self.start_ratio = start_ratio
+        self.stop_ratio = stop_ratio
+        self.min_level = min_level
+        self.noise_alpha = noise_alpha
+        self.start_frames = start_frames
+        self.hangover_frames = hangover_frames
+        # Nobody gives a 7 s voice command; "speech" that long is a new noise floor
+        self.max_speech_frames = max_speech_frames
+        # Raise the start threshold, e.g. while our own TTS is playing into the mic
+        self.boost = 1.0
+
+        self.noise_level = None
+        self.in_speech = False
+        self._voiced = 0
+        self._silent = 0
+        self._speech_frames = 0
+        self._speech_min = 0.0
+
+    def reset(self):
+        """Force the detector back to silence, keeping the noise estimate."""
+        self.in_speech = False
+        self._voiced = 0
+        self._silent = 0
+        self._speech_frames = 0
+
+    def update(self, frame):
+        """Feed one frame. Returns "start", "end" or None."""
+        level = frame_rms(frame)
+        if self.noise_level is None:
+            self.noise_level = level
+
+        start_thr = max(self.min_level, self.noise_level * self.start_ratio) * self.boost
+        stop_thr = max(self.min_level, self.noise_level * self.stop_ratio)
+
+        if not self.in_speech:
+            if level > start_thr:
+                self._voiced += 1
+                if self._voiced >= self.start_frames:
+                    self.in_speech = True
+                    self._silent = 0
+                    self._speech_frames = 0
+                    self._speech_min = level
+                    return "start"
+            else:
+                self._voiced = 0
+                self.noise_level += self.noise_alpha * (level - self.noise_level)
+            return None
+
+        self._speech_frames += 1
+        self._speech_min = min(self._speech_min, level)
+        if self._speech_frames >= self.max_speech_frames:
+            # Speech has pauses, steady noise doesn't: its quietest frame is the new floor
+            self.noise_level = max(self.noise_level, self._speech_min)
+            self.reset()
+            return "end"
+
+        if level < stop_thr:
+            self._silent += 1
+            if self._silent >= self.hangover_frames:
+                self.reset()
+                return "end"
+        else:
+            self._silent = 0
+        return None
+
+
+# -------------------- Streaming recognizer --------------------
+class StreamingRecognizer:
+    """
+    Offline Vosk recognition over a continuous frame stream.
+
+    Only voiced audio (plus a short pre-roll) is decoded. `on_partial(text)`
+    fires once a partial hypothesis has stayed the same for `stable_partials`
+    frames; `on_final(text)` fires at the end of the utterance. If either
+    callback returns True the utterance counts as handled and nothing more
+    is reported for it.
+    """
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, sample_rate=SAMPLE_RATE,
+                 on_partial=None, on_final=None, on_speech_start=None,
+                 vad=None, stable_partials=4, preroll_ms=300, max_utterance_s=8):
+        from vosk import Model, KaldiRecognizer, SetLogLevel
+
+        SetLogLevel(-1)
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Vosk model not found at {model_path} (set VOSK_MODEL_PATH).")
+        self.model = Model(model_path)
+        self.sample_rate = sample_rate
+        self.recognizer = KaldiRecognizer(self.model, sample_rate)
+
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.on_speech_start = on_speech_start
+        self.vad = vad or EnergyVAD()
+        self.stable_partials = stable_partials
+        self.preroll = deque(maxlen=max(1, preroll_ms // FRAME_MS))
+        self.max_utterance_frames = int(max_utterance_s * 1000 / FRAME_MS)
+
+        self._utterance_frames = 0
+        self._last_partial = ""
+        self._same_count = 0
+        self._handled = False
+        # Utterance in progress while decoding is paused (see observe/resume)
+        self._backlog = deque(maxlen=self.max_utterance_frames)
+
+    def observe(self, frame):
+        """
+        Track audio without decoding it, e.g. while a wake-word gate is
+        asleep. Keeps the VAD's noise estimate and the pre-roll current and
+        buffers the utterance in progress, so resume() can decode it.
+        """
+        with tracer.span("vad", "voice"):
+            event = self.vad.update(frame)
+        if event == "start":
+            self._backlog.clear()
+            self._backlog.extend(self.preroll)
+            self.preroll.clear()
+        if self.vad.in_speech:
+            self._backlog.append(frame)
+        else:
+            self._backlog.clear()
+            self.preroll.append(frame)
+
+    def resume(self):
+        """Go back to decoding, starting with the utterance observe() buffered (if still in progress)."""
+        if self.vad.in_speech and self._backlog:
+            self._begin_utterance()
+            for f in self._backlog:
+                self.recognizer.AcceptWaveform(f)
+                self._utterance_frames += 1
+        self._backlog.clear()
+
+    def feed(self, frame):
+        with tracer.span("vad", "voice"):
+            event = self.vad.update(frame)
+
+        if event == "start":
+            self._begin_utterance()
+            for f in self.preroll:
+                self.recognizer.AcceptWaveform(f)
+            self.preroll.clear()
+
+        if not self.vad.in_speech and event != "end":
+            self.preroll.append(frame)
+            return
+
+        self._utterance_frames += 1
+        decode_start = tracer.now()
+        if self.recognizer.AcceptWaveform(frame):
+            # Vosk found an endpoint on its own
+            text = json.loads(self.recognizer.Result()).get("text", "")
+            tracer.record("recognition", decode_start, "voice")
+            self._finish(text)
+        elif not self._handled:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+            tracer.record("recognition", decode_start, "voice")
+            self._check_partial(partial)
+        else:
+            tracer.record("recognition", decode_start, "voice")
+
+        if event == "end" or self._utterance_frames >= self.max_utterance_frames:
+            self._finish(json.loads(self.recognizer.FinalResult()).get("text", ""))
+            self.vad.reset()
+
+    def _begin_utterance(self):
+        self._utterance_frames = 0
+        self._last_partial = ""
+        self._same_count = 0
+        self._handled = False
+        if self.on_speech_start:
+            self.on_speech_start()
+
+    def _check_partial(self, text):
+        if not text:
+            return
+        if text == self._last_partial:
+            self._same_count += 1
+        else:
+            self._last_partial = text
+            self._same_count = 1
+        if self._same_count == self.stable_partials and self.on_partial:
+            self._handled = bool(self.on_partial(text))
+
+    def _finish(self, text):
+        if text and not self._handled and self.on_final:
+            self.on_final(text)
+        self._handled = False
+        self._last_partial = ""
+        self._same_count = 0
+        self._utterance_frames = 0
+
+    def run(self, frames, stop_event=None):
+        """Consume an iterable of frames (see microphone_frames / wav_frames)."""
+        for frame in frames:
+            if stop_event is not None and stop_event.is_set():
+                break
+            self.feed(frame)
+
+
+class UtteranceCollector:
+    """
+    Cuts a continuous frame stream into utterances with the VAD, without
+    decoding them, for recognizers that take a whole phrase at once
+    (Google Web Speech). `on_utterance(pcm)` gets the raw 16-bit PCM,
+    pre-roll included; `on_speech_start()` fires as soon as speech starts.
+    """
+
+    def __init__(self, on_utterance, on_speech_start=None, vad=None, preroll_ms=300, max_utterance_s=8):
+        self.on_utterance = on_utterance
+        self.on_speech_start = on_speech_start
+        self.vad = vad or EnergyVAD()
+        self.preroll = deque(maxlen=max(1, preroll_ms // FRAME_MS))
+        self.max_utterance_frames = int(max_utterance_s * 1000 / FRAME_MS)
+        self._frames = []
+
+    def feed(self, frame):
+        with tracer.span("vad", "voice"):
+            event = self.vad.update(frame)
+
+        if event == "start":
+            self._frames = list(self.preroll)
+            self.preroll.clear()
+            if self.on_speech_start:
+                self.on_speech_start()
+
+        if not self.vad.in_speech and event != "end":
+            self.preroll.append(frame)
+            return
+
+        self._frames.append(frame)
+        if event == "end" or len(self._frames) >= self.max_utterance_frames:
+            pcm = b"".join(self._frames)
+            self._frames = []
+            self.vad.reset()
+            self.on_utterance(pcm)
+
+    def run(self, frames, stop_event=None):
+        for frame in frames:
+            if stop_event is not None and stop_event.is_set():
+                break
+            self.feed(frame)
+
+
+# -------------------- Audio sources --------------------
+def microphone_frames(sample_rate=SAMPLE_RATE, ring_seconds=10, device=None, stop_event=None):
+    """
+    Yield frames from a microphone stream that stays open for the whole
+    session. Capture runs in PortAudio's callback thread into a ring buffer.
+    """
+    import sounddevice as sd
+
+    frame_samples = sample_rate * FRAME_MS // 1000
+    ring = AudioRingBuffer(ring_seconds * 1000 // FRAME_MS)
+
+    def callback(indata, frames, time_info, status):
+        ring.push(bytes(indata))
+
+    with sd.RawInputStream(samplerate=sample_rate, blocksize=frame_samples, dtype="int16",
+                           channels=1, device=device, callback=callback):
+        while stop_event is None or not stop_event.is_set():
+            frame = ring.pop(timeout=0.5)
+            if frame is not None:
+                yield frame
+
+
+def wav_frames(path, realtime=False):
+    """Yield FRAME_MS frames from a 16-bit mono WAV file, optionally paced like a live mic."""
+    with wave.open(path, "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit mono WAV")
+        frame_samples = wf.getframerate() * FRAME_MS // 1000
+        while True:
+            data = wf.readframes(frame_samples)
+            if len(data) < frame_samples * 2:
+                break
+            yield data
+            if realtime:
+                time.sleep(FRAME_MS / 1000)
+    # Trailing silence so the VAD can close the last utterance
+    silence = bytes(frame_samples * 2)
+    for _ in range(50):
+        yield silence
+
+
+def wav_sample_rate(path):
+    with wave.open(path, "rb") as wf:
+        return wf.getframerate()
+
+
+# -------------------- CLI for WAV fixtures --------------------
+def main():
+    parser = argparse.ArgumentParser(description="Run streaming recognition or VAD over WAV files.")
+    parser.add_argument("wavs", nargs="+", help="16-bit mono WAV files")
+    parser.add_argument("--model", default=VOSK_MODEL_PATH)
+    parser.add_argument("--vad-only", action="store_true", help="only print detected speech segments")
+    args = parser.parse_args()
+
+    for path in args.wavs:
+        print(f"== {path}")
+        if args.vad_only:
+            vad = EnergyVAD()
+            for i, frame in enumerate(wav_frames(path)):
+                event = vad.update(frame)
+                if event:
+                    print(f"{i * FRAME_MS / 1000:7.2f}s  {event}  (noise {vad.noise_level:.0f})")
+            continue
+
+        t0 = time.perf_counter()
+        rec = StreamingRecognizer(
+            args.model,
+            sample_rate=wav_sample_rate(path),
+            on_partial=lambda text: print(f"  stable partial: {text}"),
+            on_final=lambda text: print(f"  final:          {text}"),
+        )
+        rec.run(wav_frames(path))
+        print(f"  decoded in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
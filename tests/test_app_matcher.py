@@ -0,0 +1,53 @@
+from app_matcher import AppMatcher
+
+KNOWN_APPS = {
+    "chrome": "chrome.exe",
+    "google chrome": "chrome.exe",
+    "microsoft edge": "msedge.exe",
+    "file explorer": "explorer.exe",
+}
+CATALOG = {
+    "visual studio code": "code.lnk",
+    "visual studio": "devenv.lnk",
+    "spotify": "spotify.lnk",
+    "microsoft edge": "edge.lnk",
+}
+WEBSITES = {"google": "google", "youtube": "youtube", "yt": "youtube"}
+
+
+def make_matcher():
+    return AppMatcher([("exe", KNOWN_APPS), ("app", CATALOG), ("website", WEBSITES)])
+
+
+def test_exact_name_wins():
+    entry, score = make_matcher().match("spotify")
+    assert entry.name == "spotify" and entry.kind == "app" and score == 100
+
+
+def test_earlier_source_wins_on_duplicate_names():
+    matcher = make_matcher()
+    assert len(matcher) == 10
+    assert matcher.exact("microsoft edge").kind == "exe"
+
+
+def test_fuzzy_match_and_threshold():
+    matcher = make_matcher()
+    entry, _ = matcher.match("spotfy")
+    assert entry.name == "spotify"
+    assert matcher.match("completely unrelated words") is None
+
+
+def test_exact_is_normalized():
+    matcher = make_matcher()
+    assert matcher.exact("  Google Chrome! ").name == "google chrome"
+    assert matcher.exact("chrom") is None
+
+
+def test_continued_only_by_whole_words():
+    matcher = make_matcher()
+    # "google" may still become "google chrome", "visual studio" may become "... code"
+    assert matcher.continued("google")
+    assert matcher.continued("visual studio")
+    assert not matcher.continued("visual studio code")
+    assert not matcher.continued("chrome")
+    assert not matcher.continued("goo")
@@ -0,0 +1,52 @@
+from control_service import CoreScheduler, Session
+from session_env import display_region, parse_region
+
+
+def sessions(*names, pinned=None):
+    pinned = pinned or {}
+    return [Session(n, "hand", cores=pinned.get(n)) for n in names]
+
+
+def test_idle_cores_are_split_evenly():
+    plan = CoreScheduler(range(1, 8)).assign(sessions("a", "b", "c"))
+    assert plan == {"a": [1, 2, 3], "b": [4, 5], "c": [6, 7]}
+
+
+def test_pinned_cores_are_kept_and_excluded_from_the_rest():
+    plan = CoreScheduler(range(1, 8)).assign(sessions("a", "b", "c", pinned={"b": [1, 2]}))
+    assert plan["b"] == [1, 2]
+    assert sorted(plan["a"] + plan["c"]) == [3, 4, 5, 6, 7]
+    assert not set(plan["a"]) & set(plan["c"])
+
+
+def test_pinned_cores_outside_the_budget_are_ignored():
+    plan = CoreScheduler([2, 3]).assign(sessions("a", pinned={"a": [0, 1]}))
+    assert plan == {"a": [2, 3]}
+
+
+def test_more_sessions_than_cores_double_up_on_the_least_loaded():
+    plan = CoreScheduler([1, 2]).assign(sessions("a", "b", "c", "d", "e"))
+    assert all(len(cores) == 1 for cores in plan.values())
+    per_core = [sum(cores == [c] for cores in plan.values()) for c in (1, 2)]
+    assert sorted(per_core) == [2, 3]
+
+
+def test_empty_budget_assigns_nothing():
+    assert CoreScheduler([]).assign(sessions("a")) == {}
+
+
+def test_parse_region():
+    assert parse_region("0, 0, 960,1080") == (0, 0, 960, 1080)
+    assert parse_region([960, 0, 960, 1080]) == (960, 0, 960, 1080)
+    assert parse_region("1,2,3") is None
+    assert parse_region("0,0,0,100") is None
+    assert parse_region("a,b,c,d") is None
+
+
+def test_display_region_is_clipped_to_the_screen(monkeypatch):
+    monkeypatch.setenv("VCH_DISPLAY_REGION", "1800,0,400,900")
+    assert display_region(1920, 1080) == (1800, 0, 120, 900)
+    monkeypatch.setenv("VCH_DISPLAY_REGION", "garbage")
+    assert display_region(1920, 1080) == (0, 0, 1920, 1080)
+    monkeypatch.delenv("VCH_DISPLAY_REGION")
+    assert display_region(1920, 1080) == (0, 0, 1920, 1080)
@@ -0,0 +1,103 @@
+import time
+
+from frame_scheduler import ASYNC, INTERLEAVE, SERIAL, FusedRunner, ModelScheduler
+
+
+def settle(sched, hand_ms, face_ms, frame_ms, frames=None):
+    """Feed the same measurements until the scheduler re-evaluates."""
+    for _ in range(frames or sched.reevaluate_frames):
+        sched.observe(hand_ms=hand_ms, face_ms=face_ms)
+        sched.end_frame(frame_ms, hand_ms + face_ms)
+
+
+def test_serial_while_both_models_fit():
+    sched = ModelScheduler(budget_ms=33, allow_async=True)
+    settle(sched, hand_ms=10, face_ms=10, frame_ms=25)
+    assert sched.mode == SERIAL
+    assert all(sched.face_due() for _ in range(5))
+
+
+def test_async_when_over_budget_with_a_second_core():
+    sched = ModelScheduler(budget_ms=33, allow_async=True)
+    settle(sched, hand_ms=15, face_ms=20, frame_ms=40)
+    assert sched.mode == ASYNC
+
+
+def test_interleave_on_one_core_keeps_min_face_rate():
+    sched = ModelScheduler(budget_ms=33, fps=30, min_face_hz=8, allow_async=False)
+    settle(sched, hand_ms=15, face_ms=20, frame_ms=40)
+    assert sched.mode == INTERLEAVE
+    assert sched.face_interval == 3
+    assert [sched.face_due() for _ in range(6)] == [False, False, True, False, False, True]
+
+
+def test_decision_waits_for_reevaluate_frames():
+    sched = ModelScheduler(budget_ms=33, allow_async=True, reevaluate_frames=30)
+    settle(sched, hand_ms=15, face_ms=20, frame_ms=40, frames=29)
+    assert sched.mode == SERIAL
+    settle(sched, hand_ms=15, face_ms=20, frame_ms=40, frames=1)
+    assert sched.mode == ASYNC
+
+
+def test_goes_back_to_serial_when_models_speed_up():
+    sched = ModelScheduler(budget_ms=33, allow_async=False, alpha=1.0)
+    settle(sched, hand_ms=15, face_ms=20, frame_ms=40)
+    assert sched.mode == INTERLEAVE
+    settle(sched, hand_ms=5, face_ms=5, frame_ms=12)
+    assert sched.mode == SERIAL
+
+
+class Models:
+    def __init__(self, face_delay=0.0):
+        self.face_delay = face_delay
+        self.hand_calls = 0
+        self.face_calls = 0
+
+    def hand(self, image):
+        self.hand_calls += 1
+        return ("hand", image)
+
+    def face(self, image):
+        self.face_calls += 1
+        time.sleep(self.face_delay)
+        return ("face", image)
+
+
+def test_runner_serial_runs_both_models_on_the_same_image():
+    models = Models()
+    runner = FusedRunner(models.hand, models.face, ModelScheduler(allow_async=False))
+    hand, face, face_time = runner.run("img", captured=1.0)
+    assert hand == ("hand", "img") and face == ("face", "img") and face_time == 1.0
+    runner.close()
+
+
+def test_runner_interleave_reuses_hand_result_on_face_frames():
+    models = Models()
+    sched = ModelScheduler(allow_async=False)
+    sched.mode, sched.face_interval = INTERLEAVE, 3
+    sched.face_ms = 20.0
+    runner = FusedRunner(models.hand, models.face, sched)
+
+    results = [runner.run(i) for i in range(6)]
+    assert models.face_calls == 2
+    assert models.hand_calls == 4
+    # Frame 2 is a face frame: its hand result is frame 1's
+    assert results[2][0] == ("hand", 1) and results[2][1] == ("face", 2)
+    runner.close()
+
+
+def test_runner_async_delivers_face_results_on_a_later_frame():
+    models = Models(face_delay=0.02)
+    sched = ModelScheduler(allow_async=True)
+    sched.mode = ASYNC
+    runner = FusedRunner(models.hand, models.face, sched)
+
+    hand, face, _ = runner.run("f0", captured=0.0)
+    assert hand == ("hand", "f0") and face is None
+    time.sleep(0.05)
+    hand, face, face_time = runner.run("f1", captured=1.0)
+    assert hand == ("hand", "f1")
+    # The face result belongs to the frame it was computed on
+    assert face == ("face", "f0") and face_time == 0.0
+    runner.close()
+    assert sched.face_ms is not None
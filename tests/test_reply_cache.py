@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from reply_cache import ReplyCache, is_context_dependent, normalize_message
+
+HISTORY = [{"role": "user", "content": "my order number is 4411"},
+           {"role": "assistant", "content": "Noted."}]
+
+
+class Generator:
+    def __init__(self, reply="answer"):
+        self.reply = reply
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"{self.reply} {self.calls}"
+
+
+def test_normalize_message():
+    assert normalize_message("  What is  Python?? ") == "what is python"
+
+
+def test_context_dependence():
+    assert not is_context_dependent("how do i stop it", [])
+    assert is_context_dependent("how do i stop it", HISTORY)
+    assert is_context_dependent("why", HISTORY)
+    assert is_context_dependent("and what about java", HISTORY)
+    assert not is_context_dependent("what is python used for", HISTORY)
+
+
+def test_hit_for_trivial_variants():
+    cache = ReplyCache()
+    gen = Generator()
+    assert cache.get_or_generate("What is Python?", [], gen) == "answer 1"
+    assert cache.get_or_generate("what is python", [], gen) == "answer 1"
+    assert gen.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_follow_ups_bypass_the_cache():
+    cache = ReplyCache()
+    gen = Generator()
+    cache.get_or_generate("how do I stop it", HISTORY, gen)
+    cache.get_or_generate("how do I stop it", HISTORY, gen)
+    assert gen.calls == 2
+    assert cache.stats()["bypasses"] == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_global_scope_never_stores_history_based_replies():
+    cache = ReplyCache(scope="global")
+    private = Generator("private")
+    assert cache.get_or_generate("what is python used for", HISTORY, private, user_id=1) == "private 1"
+    assert cache.stats()["entries"] == 0
+
+    # Another user must get a fresh answer, not user 1's
+    public = Generator("public")
+    assert cache.get_or_generate("what is python used for", [], public, user_id=2) == "public 1"
+    # ...which is safe to share, also with users who have history
+    assert cache.get_or_generate("what is python used for", HISTORY, private, user_id=1) == "public 1"
+
+
+def test_user_scope_keeps_users_apart():
+    cache = ReplyCache(scope="user")
+    gen = Generator()
+    assert cache.get_or_generate("what is python used for", HISTORY, gen, user_id=1) == "answer 1"
+    assert cache.get_or_generate("what is python used for", HISTORY, gen, user_id=1) == "answer 1"
+    assert cache.get_or_generate("what is python used for", HISTORY, gen, user_id=2) == "answer 2"
+
+
+def test_context_fingerprint_is_part_of_the_key():
+    cache = ReplyCache()
+    gen = Generator()
+    cache.get_or_generate("what is python", [], gen, context="model-a")
+    assert cache.get_or_generate("what is python", [], gen, context="model-b") == "answer 2"
+
+
+def test_lru_eviction_and_ttl():
+    cache = ReplyCache(max_entries=2, ttl=0.05)
+    for text in ("one", "two", "three"):
+        cache.put(cache.make_key(text), text)
+    assert cache.get(cache.make_key("one")) is None
+    assert cache.get(cache.make_key("three")) == "three"
+    assert cache.stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert cache.get(cache.make_key("three")) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disabled_and_bad_scope():
+    gen = Generator()
+    cache = ReplyCache(enabled=False)
+    cache.get_or_generate("what is python", [], gen)
+    cache.get_or_generate("what is python", [], gen)
+    assert gen.calls == 2
+    with pytest.raises(ValueError):
+        ReplyCache(scope="team")
@@ -0,0 +1,93 @@
+import time
+
+from speech_output import NullBackend, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, SpeechQueue
+
+
+def busy_queue(seconds=0.3, **kwargs):
+    """
+    Queue whose worker is busy with an urgent message, so later items stay
+    queued. Set backend.seconds_per_char = 0 once they are in.
+    """
+    backend = NullBackend(seconds_per_char=seconds / 10)
+    speech = SpeechQueue(backend, **kwargs)
+    speech.say("x" * 10, priority=PRIORITY_HIGH)
+    return speech, backend
+
+
+def wait_until(cond, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return cond()
+
+
+def test_priority_then_fifo():
+    speech, backend = busy_queue()
+    speech.say("low", priority=PRIORITY_LOW)
+    speech.say("normal 1")
+    speech.say("urgent", priority=PRIORITY_HIGH)
+    speech.say("normal 2")
+    backend.seconds_per_char = 0
+    assert speech.wait_idle(5)
+    assert backend.spoken[1:] == ["urgent", "normal 1", "normal 2", "low"]
+    speech.close()
+
+
+def test_same_key_or_text_replaces_queued_message():
+    speech, backend = busy_queue()
+    speech.say("Refreshing app list.", key="status")
+    speech.say("Found 12 apps.", key="status")
+    speech.say("Opening chrome")
+    speech.say("Opening chrome")
+    backend.seconds_per_char = 0
+    assert speech.wait_idle(5)
+    assert backend.spoken[1:] == ["Found 12 apps.", "Opening chrome"]
+    assert speech.merged == 2
+    speech.close()
+
+
+def test_barge_in_keeps_only_urgent_speech():
+    speech, backend = busy_queue()
+    speech.say("chatter", priority=PRIORITY_LOW)
+    speech.say("Opening chrome")
+    speech.beep()
+    speech.say("Goodbye.", priority=PRIORITY_HIGH)
+    speech.barge_in()
+    backend.seconds_per_char = 0
+    assert speech.wait_idle(5)
+    assert backend.spoken[1:] == ["Goodbye."]
+    assert backend.beeps == 0
+    speech.close()
+
+
+def test_barge_in_stops_current_message():
+    backend = NullBackend(seconds_per_char=0.05)
+    speech = SpeechQueue(backend)
+    speech.say("a long answer nobody wants to hear", priority=PRIORITY_NORMAL)
+    assert wait_until(lambda: speech.is_speaking)
+    started = time.monotonic()
+    speech.barge_in()
+    assert speech.wait_idle(5)
+    assert time.monotonic() - started < 1.0
+    assert speech.interrupted == 1
+    speech.close()
+
+
+def test_speaking_callback_brackets_each_message():
+    states = []
+    speech = SpeechQueue(NullBackend(), on_speaking=states.append)
+    speech.say("one")
+    speech.beep()
+    speech.say("two")
+    assert speech.wait_idle(5)
+    assert states == [True, False, True, False]
+    speech.close()
+
+
+def test_close_drains_then_ignores_new_messages():
+    backend = NullBackend()
+    speech = SpeechQueue(backend)
+    speech.say("Goodbye.", priority=PRIORITY_HIGH)
+    speech.close(drain=True)
+    speech.say("too late")
+    assert backend.spoken == ["Goodbye."]
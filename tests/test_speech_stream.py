@@ -0,0 +1,107 @@
+from array import array
+
+from speech_stream import AudioRingBuffer, EnergyVAD, frame_rms
+
+
+def pcm(level, samples=480):
+    """One 30 ms frame of 16 kHz square wave whose RMS is `level`."""
+    return array("h", [level, -level] * (samples // 2)).tobytes()
+
+
+def feed(vad, frame, count):
+    return [vad.update(frame) for _ in range(count)]
+
+
+def test_frame_rms():
+    assert frame_rms(pcm(1000)) == 1000
+    assert frame_rms(b"") == 0.0
+
+
+def test_vad_start_and_end():
+    vad = EnergyVAD(start_frames=3, hangover_frames=5)
+    assert set(feed(vad, pcm(100), 20)) == {None}
+
+    events = feed(vad, pcm(3000), 3)
+    assert events == [None, None, "start"]
+    assert vad.in_speech
+
+    events = feed(vad, pcm(100), 5)
+    assert events == [None] * 4 + ["end"]
+    assert not vad.in_speech
+
+
+def test_vad_ignores_short_clicks():
+    vad = EnergyVAD(start_frames=3)
+    feed(vad, pcm(100), 10)
+    for _ in range(5):
+        assert vad.update(pcm(3000)) is None
+        assert vad.update(pcm(100)) is None
+    assert not vad.in_speech
+
+
+def test_noise_floor_follows_silence_not_speech():
+    vad = EnergyVAD(start_frames=3, hangover_frames=5)
+    feed(vad, pcm(200), 50)
+    floor = vad.noise_level
+    assert 190 < floor <= 200
+
+    feed(vad, pcm(5000), 30)
+    assert vad.noise_level == floor
+
+
+def test_steady_noise_becomes_the_new_floor():
+    vad = EnergyVAD(start_frames=3, max_speech_frames=50)
+    feed(vad, pcm(100), 10)
+    events = feed(vad, pcm(2000), 60)
+    assert "start" in events and "end" in events
+    assert vad.noise_level >= 2000
+    # The fan that "spoke" is now background: no new utterance starts
+    assert set(feed(vad, pcm(2000), 20)) == {None}
+
+
+def test_boost_raises_start_threshold():
+    vad = EnergyVAD(start_frames=3)
+    feed(vad, pcm(100), 10)
+    vad.boost = 4.0
+    assert set(feed(vad, pcm(1000), 10)) == {None}
+    vad.boost = 1.0
+    assert "start" in feed(vad, pcm(3000), 3)
+
+
+def test_ring_buffer_drops_oldest_when_full():
+    ring = AudioRingBuffer(3)
+    for i in range(5):
+        ring.push(i)
+    assert ring.overruns == 2
+    assert [ring.pop(0) for _ in range(3)] == [2, 3, 4]
+    assert ring.pop(0.01) is None
+
+
+def test_collector_cuts_utterances_with_preroll():
+    from speech_stream import UtteranceCollector
+
+    utterances, starts = [], []
+    collector = UtteranceCollector(utterances.append, on_speech_start=lambda: starts.append(True),
+                                   vad=EnergyVAD(start_frames=3, hangover_frames=5), preroll_ms=90)
+    quiet, loud = pcm(100), pcm(3000)
+    for frame in [quiet] * 20 + [loud] * 10 + [quiet] * 5 + [quiet] * 10:
+        collector.feed(frame)
+
+    assert starts == [True]
+    assert len(utterances) == 1
+    frame_bytes = len(quiet)
+    # 3 pre-roll frames (2 of them the loud onset), the rest of the speech, then the hangover
+    assert len(utterances[0]) == (3 + 8 + 5) * frame_bytes
+    assert utterances[0][-frame_bytes:] == quiet
+
+
+def test_collector_splits_overlong_utterances():
+    from speech_stream import UtteranceCollector
+
+    utterances = []
+    collector = UtteranceCollector(utterances.append, vad=EnergyVAD(start_frames=1, max_speech_frames=1000),
+                                   preroll_ms=30, max_utterance_s=0.3)
+    for frame in [pcm(100)] * 5 + [pcm(3000)] * 25:
+        collector.feed(frame)
+    assert len(utterances) == 2
+    assert all(len(u) == 10 * len(pcm(100)) for u in utterances)
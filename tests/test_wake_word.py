@@ -0,0 +1,86 @@
+from array import array
+
+from speech_output import NullBackend, PRIORITY_HIGH, SpeechQueue
+from speech_stream import EnergyVAD
+from wake_word import WakeWordGate, strip_wake_phrase
+
+
+def pcm(level, samples=480):
+    return array("h", [level, -level] * (samples // 2)).tobytes()
+
+
+class FakeRecognizer:
+    """Stands in for StreamingRecognizer: records calls, resuming counts as speech starting."""
+
+    def __init__(self, on_speech_start=None):
+        self.vad = EnergyVAD(start_frames=1, hangover_frames=2)
+        self.on_speech_start = on_speech_start
+        self.calls = []
+
+    def observe(self, frame):
+        self.vad.update(frame)
+        self.calls.append("observe")
+
+    def resume(self):
+        self.calls.append("resume")
+        if self.vad.in_speech and self.on_speech_start:
+            self.on_speech_start()
+
+    def feed(self, frame):
+        self.vad.update(frame)
+        self.calls.append("feed")
+
+
+class FakeSpotter:
+    def __init__(self, wake_on):
+        self.wake_on = wake_on
+        self.frames = 0
+
+    def feed(self, frame):
+        self.frames += 1
+        return self.frames == self.wake_on
+
+
+def test_wake_hands_over_and_sleeps_again():
+    rec = FakeRecognizer()
+    woke, slept = [], []
+    gate = WakeWordGate(rec, FakeSpotter(wake_on=3), awake_seconds=0.09,
+                        on_wake=lambda: woke.append(True), on_sleep=lambda: slept.append(True))
+
+    for _ in range(3):
+        gate.feed(pcm(3000))
+    assert gate.awake and woke == [True]
+    assert rec.calls == ["observe", "observe", "observe", "resume"]
+
+    gate.feed(pcm(3000))
+    assert rec.calls[-1] == "feed"
+    for _ in range(10):
+        gate.feed(pcm(10))
+    assert not gate.awake and slept == [True]
+
+
+def test_wake_beep_survives_resume_barge_in():
+    backend = NullBackend(seconds_per_char=0.01)
+    speech = SpeechQueue(backend)
+    # Keep the worker busy so the beep is still queued when resume() barges in
+    speech.say("x" * 20, priority=PRIORITY_HIGH)
+
+    def on_wake():
+        speech.barge_in()
+        speech.beep()
+
+    rec = FakeRecognizer(on_speech_start=speech.barge_in)
+    gate = WakeWordGate(rec, FakeSpotter(wake_on=4), on_wake=on_wake)
+    for _ in range(3):
+        gate.feed(pcm(10))
+    gate.feed(pcm(3000))
+    assert rec.vad.in_speech
+
+    assert speech.wait_idle(5)
+    assert backend.beeps == 1
+    speech.close()
+
+
+def test_strip_wake_phrase():
+    assert strip_wake_phrase("Hey Control open chrome", "hey control") == "open chrome"
+    assert strip_wake_phrase("open chrome", "hey control") == "open chrome"
@@ -0,0 +1,84 @@
+import threading
+
+from write_behind import WriteBehindQueue
+
+
+class FakeStore:
+    """flush_fn stand-in: rejects rows marked bad, like a constraint violation would."""
+
+    def __init__(self):
+        self.rows = []
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def flush(self, rows):
+        with self.lock:
+            self.calls += 1
+            if any(r.get("bad") for r in rows):
+                raise ValueError("constraint failed")
+            self.rows.extend(rows)
+
+
+def test_batches_rows_and_drains_on_close():
+    store = FakeStore()
+    q = WriteBehindQueue(store.flush, batch_size=10, flush_interval=0.01)
+    for i in range(25):
+        q.put({"n": i})
+    q.close()
+    assert [r["n"] for r in store.rows] == list(range(25))
+    assert q.rows_written == 25
+    assert q.pending() == []
+
+
+def test_pending_shows_rows_until_written():
+    release = threading.Event()
+    store = FakeStore()
+
+    def slow_flush(rows):
+        release.wait(5)
+        store.flush(rows)
+
+    q = WriteBehindQueue(slow_flush, batch_size=2, flush_interval=0.01)
+    q.put({"user": 1, "n": 0})
+    q.put({"user": 2, "n": 1})
+    q.put({"user": 1, "n": 2})
+    assert [r["n"] for r in q.pending(lambda r: r["user"] == 1)] == [0, 2]
+    release.set()
+    assert q.flush(timeout=5)
+    assert q.pending() == []
+    q.close()
+
+
+def test_bad_row_is_dropped_without_blocking_the_rest():
+    store = FakeStore()
+    q = WriteBehindQueue(store.flush, batch_size=10, flush_interval=0.01, max_retries=2)
+    q.put({"n": 0})
+    q.put({"n": 1, "bad": True})
+    q.put({"n": 2})
+    assert q.flush(timeout=5)
+    assert [r["n"] for r in store.rows] == [0, 2]
+    assert q.rows_dropped == 1
+
+    # Later writes keep going through
+    q.put({"n": 3})
+    assert q.flush(timeout=5)
+    assert [r["n"] for r in store.rows] == [0, 2, 3]
+    q.close()
+
+
+def test_transient_failure_is_retried():
+    store = FakeStore()
+    failures = [2]
+
+    def flaky(rows):
+        if failures[0]:
+            failures[0] -= 1
+            raise OSError("database is locked")
+        store.flush(rows)
+
+    q = WriteBehindQueue(flaky, batch_size=5, flush_interval=0.01, max_retries=3)
+    q.put({"n": 0})
+    assert q.flush(timeout=5)
+    assert [r["n"] for r in store.rows] == [0]
+    assert q.rows_dropped == 0
+    q.close()
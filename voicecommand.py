@@ -2,69 +2,62 @@
 import os
 import subprocess
 import psutil
+import pythoncom
 import win32com.client
 import speech_recognition as sr
-import pyttsx3
-from fuzzywuzzy import process
-import time
-import winsound
+import threading
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from app_catalog import AppCatalog
+from profiling import get_tracer
+from app_matcher import AppMatcher
+from speech_stream import StreamingRecognizer, UtteranceCollector, EnergyVAD, microphone_frames, SAMPLE_RATE
+from wake_word import WakeWordSpotter, WakeWordGate, WAKE_PHRASE, strip_wake_phrase
+from speech_output import SpeechQueue, Pyttsx3Backend, NullBackend, PRIORITY_HIGH, PRIORITY_NORMAL
 
 # -------------------- User Settings --------------------
-LISTEN_TIMEOUT = 5         # Idle seconds to go to sleep
 PHRASE_LIMIT = 5           # Max seconds per phrase
 BEEP_MS = 100              # Short beep duration in ms
 VOICE_RATE = 160           # Calm voice
+RECOGNITION_MODE = os.getenv("VOICE_RECOGNITION", "google")  # "google" (online) or "vosk" (offline streaming)
+EXIT_WORDS = ["exit", "quit", "stop", "goodbye"]
+TTS_BACKEND = os.getenv("VOICE_TTS", "pyttsx3")  # "pyttsx3" or "null" (print only)
+BARGE_IN_BOOST = 2.5       # How much louder than normal the user must be to talk over the assistant
+
+tracer = get_tracer("voicecommand")
 
 # -------------------- Voice Setup --------------------
-try:
-    engine = pyttsx3.init()
-except Exception as e:
-    print("TTS failed, running without voice:", e)
-    engine = None
+# Speech plays on a worker thread, so we keep listening while the assistant talks
+vad = EnergyVAD()
+
+def on_speaking(speaking):
+    # Our own voice reaches the mic too; only a clearly louder user should trigger barge-in
+    vad.boost = BARGE_IN_BOOST if speaking else 1.0
 
-engine.setProperty("rate", VOICE_RATE)
+backend = NullBackend() if TTS_BACKEND == "null" else Pyttsx3Backend(rate=VOICE_RATE)
+speech = SpeechQueue(backend, on_speaking=on_speaking)
 
-def speak(text):
+def speak(text, priority=PRIORITY_NORMAL, key=None):
     print(f"Assistant: {text}")
-    if engine:
-         engine.say(text)
-         engine.runAndWait()
+    speech.say(text, priority=priority, key=key)
 
 def beep():
-    winsound.Beep(1000, BEEP_MS)
+    speech.beep(1000, BEEP_MS)
 
 # -------------------- App Scanning --------------------
-def get_shortcuts():
-    paths = [
-        r"C:\ProgramData\Microsoft\Windows\Start Menu\Programs",
-        os.path.join(os.environ.get("APPDATA", ""), r"Microsoft\Windows\Start Menu\Programs")
-    ]
-    shortcuts = {}
-    for path in paths:
-        if not os.path.isdir(path):
-            continue
-        for root, _, files in os.walk(path):
-            for f in files:
-                if f.lower().endswith(".lnk"):
-                    shortcuts[os.path.splitext(f)[0].lower()] = os.path.join(root, f)
-    return shortcuts
-
 def get_uwp_apps():
-    uwp = {}
+    # Called from the catalog's background thread, which has to set up COM for itself.
+    # Errors propagate so the catalog logs them and keeps the apps it found last time.
+    pythoncom.CoInitialize()
     try:
         shell = win32com.client.Dispatch("Shell.Application")
         ns = shell.Namespace("shell:AppsFolder")
-        for item in ns.Items():
-            uwp[item.Name.lower()] = item.Path
-    except Exception:
-        pass
-    return uwp
+        return {item.Name.lower(): item.Path for item in ns.Items()}
+    finally:
+        pythoncom.CoUninitialize()
 
-def get_all_apps():
-    apps = get_shortcuts()
-    apps.update(get_uwp_apps())
-    return apps
+# Start Menu shortcuts are rescanned incrementally in the background (see app_catalog.py)
+catalog = AppCatalog(extra_sources=[get_uwp_apps], refresh_interval=600)
 
 # -------------------- Known EXE Apps --------------------
 KNOWN_APPS = {
@@ -113,44 +106,65 @@ def match_website(name):
     return None
 
 # -------------------- Fuzzy Match --------------------
-def find_best_match(name, app_map, threshold=65):
-    choices = list(app_map.keys()) + list(KNOWN_APPS.keys()) + list(KNOWN_UWP_APPS.keys())
-    match = process.extractOne(name, choices)
-    if not match or match[1] < threshold:
-        return None
-    return match[0]
+WEBSITE_ALIASES = {alias: site for site, aliases in WEBSITES.items() for alias in aliases}
+
+def build_matcher(app_map):
+    # Earlier sources win when names collide, same order open_app used to check them in
+    return AppMatcher([
+        ("exe", KNOWN_APPS),
+        ("uwp", KNOWN_UWP_APPS),
+        ("app", app_map),
+        ("website", WEBSITE_ALIASES),
+    ])
+
+matcher = build_matcher({})
+
+def rebuild_matcher(app_map):
+    global matcher
+    matcher = build_matcher(app_map)
+
+def find_best_match(name, threshold=65):
+    match = matcher.match(name, threshold)
+    return match[0] if match else None
 
 # -------------------- Open App --------------------
-def open_app(name, app_map):
+def open_app(name):
     name = name.lower().strip()
     # Check websites first
     website = match_website(name)
     if website:
-        speak(f"Opening {name} in browser...")
+        speak(f"Opening {name} in browser...", key="status")
         webbrowser.open(website)
         return
 
-    app_name = find_best_match(name, app_map)
-    if not app_name:
+    match = find_best_match(name)
+    if not match:
         speak(f"I couldn't find an app named {name}.")
         return
-    speak(f"Opening {app_name}...")
+
+    # Fuzzy hit on a website alias ("you tube", "git hub")
+    if match.kind == "website":
+        speak(f"Opening {match.target} in browser...", key="status")
+        webbrowser.open(WEBSITE_URLS[match.target])
+        return
+
+    app_name = match.name
+    speak(f"Opening {app_name}...", key="status")
 
     try:
         # Known EXE
-        if app_name in KNOWN_APPS:
-            cmd = KNOWN_APPS[app_name]
-            subprocess.Popen(cmd, shell=True)
+        if match.kind == "exe":
+            subprocess.Popen(match.target, shell=True)
             return
 
         # Known UWP
-        if app_name in KNOWN_UWP_APPS:
-            cmd = f'start shell:AppsFolder\\{KNOWN_UWP_APPS[app_name]}'
+        if match.kind == "uwp":
+            cmd = f'start shell:AppsFolder\\{match.target}'
             subprocess.Popen(cmd, shell=True)
             return
 
         # Shortcut or UWP scanned automatically
-        path = app_map.get(app_name)
+        path = match.target
         if not path:
             speak("App path not found.")
             return
@@ -205,48 +219,141 @@ def list_apps(app_map):
 
 # -------------------- Listen --------------------
 recognizer = sr.Recognizer()
-def listen(timeout=LISTEN_TIMEOUT, phrase_time_limit=PHRASE_LIMIT):
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)
-        try:
-            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-            return recognizer.recognize_google(audio, language="en-US").lower()
-        except:
-            return ""
+def recognize_google(pcm):
+    """16-bit mono PCM of one utterance -> lower-case text, "" if nothing was understood."""
+    try:
+        audio = sr.AudioData(pcm, SAMPLE_RATE, 2)
+        return recognizer.recognize_google(audio, language="en-US").lower()
+    except (sr.UnknownValueError, sr.RequestError):
+        return ""
+
+# -------------------- Command Dispatch --------------------
+def handle_command(cmd):
+    """Run one recognized command. Returns False when the assistant should exit."""
+    print("Command heard:", cmd)
+
+    if cmd.startswith("open "):
+        open_app(cmd.replace("open ", "", 1).strip())
+    elif cmd.startswith("close "):
+        close_app(cmd.replace("close ", "", 1).strip())
+    elif "list app" in cmd or "show app" in cmd or "list apps" in cmd:
+        # Always the latest index; the catalog swaps it in after background refreshes
+        list_apps(catalog.apps())
+    elif "refresh" in cmd:
+        catalog.refresh_async()
+        speak("Refreshing app list.", key="status")
+    elif cmd in EXIT_WORDS:
+        speak("Goodbye.", priority=PRIORITY_HIGH)
+        return False
+    else:
+        # Try opening app or website directly
+        open_app(cmd)
+    return True
+
+def ready_for_early_dispatch(text):
+    """
+    Whether a stable partial can be acted on before the utterance ends.
+    "open google" may still become "open google chrome", so only act early
+    on the exact name of an app that no longer name continues. Website
+    aliases always wait for the final result.
+    """
+    if text in EXIT_WORDS or "list app" in text or "show app" in text:
+        return True
+    if text.startswith("open "):
+        target = text.replace("open ", "", 1).strip()
+        entry = matcher.exact(target)
+        return entry is not None and entry.kind != "website" and not matcher.continued(target)
+    return False
 
 # -------------------- Main Loop --------------------
+def run_google():
+    """
+    Online recognition on the same always-open microphone stream as the
+    Vosk mode. The VAD cuts utterances and barges in when the user talks
+    over a reply; each utterance goes to Google on a single worker thread,
+    so capture never pauses while a request is in flight.
+    """
+    stop = threading.Event()
+    worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="google-speech")
+
+    def recognize_and_dispatch(pcm):
+        if stop.is_set():
+            return
+        with tracer.span("recognition", "voice"):
+            cmd = recognize_google(pcm)
+        if not cmd:
+            return
+        try:
+            with tracer.span("dispatch", "voice"):
+                keep_going = handle_command(cmd)
+        except Exception as e:
+            # The executor would keep the error to itself
+            print("Command failed:", e)
+            return
+        if not keep_going:
+            stop.set()
+
+    collector = UtteranceCollector(lambda pcm: worker.submit(recognize_and_dispatch, pcm),
+                                   on_speech_start=speech.barge_in, vad=vad,
+                                   max_utterance_s=PHRASE_LIMIT)
+    beep()
+    try:
+        collector.run(microphone_frames(stop_event=stop), stop_event=stop)
+    finally:
+        worker.shutdown(wait=True, cancel_futures=True)
+
+def on_wake():
+    speech.barge_in()
+    beep()
+
+def run_streaming():
+    """
+    Offline recognition on one continuously open microphone stream. With a
+    wake phrase set (VOICE_WAKE_PHRASE, empty to disable), full recognition
+    only runs for a few seconds after it is heard.
+    """
+    stop = threading.Event()
+
+    def clean(text):
+        text = text.lower()
+        return strip_wake_phrase(text, WAKE_PHRASE) if WAKE_PHRASE else text
+
+    def dispatch(text):
+        text = clean(text)
+        if not text:
+            return False
+        with tracer.span("dispatch", "voice"):
+            keep_going = handle_command(text)
+        if not keep_going:
+            stop.set()
+        return True
+
+    def on_partial(text):
+        if ready_for_early_dispatch(clean(text)):
+            return dispatch(text)
+        return False
+
+    stream = StreamingRecognizer(on_partial=on_partial, on_final=dispatch,
+                                 on_speech_start=speech.barge_in, vad=vad,
+                                 max_utterance_s=PHRASE_LIMIT)
+    runner = stream
+    if WAKE_PHRASE:
+        spotter = WakeWordSpotter(stream.model, stream.sample_rate, WAKE_PHRASE)
+        runner = WakeWordGate(stream, spotter, on_wake=on_wake)
+        print(f'Say "{WAKE_PHRASE}" before a command.')
+    beep()
+    runner.run(microphone_frames(stop_event=stop), stop_event=stop)
+
 if __name__ == "__main__":
+    # Keep the fuzzy-match index in step with the catalog, built off the listen loop
+    catalog.on_update.append(rebuild_matcher)
+    catalog.start()
     speak("Assistant ready. Listening continuously...")
-    app_map = get_all_apps()
-    last_refresh = time.time()
-
-    while True:
-        # Refresh app list every 10 minutes
-        if time.time() - last_refresh > 600:
-            app_map = get_all_apps()
-            last_refresh = time.time()
-            speak("App list refreshed.")
-
-        beep()
-        cmd = listen()
-        if not cmd:
-            # Sleep mode if nothing heard
-            continue
-        print("Command heard:", cmd)
-
-        if cmd.startswith("open "):
-            open_app(cmd.replace("open ", "", 1).strip(), app_map)
-        elif cmd.startswith("close "):
-            close_app(cmd.replace("close ", "", 1).strip())
-        elif "list app" in cmd or "show app" in cmd or "list apps" in cmd:
-            list_apps(app_map)
-        elif "refresh" in cmd:
-            app_map = get_all_apps()
-            last_refresh = time.time()
-            speak("App list refreshed.")
-        elif cmd in ["exit", "quit", "stop", "goodbye"]:
-            speak("Goodbye.")
-            break
-        else:
-            # Try opening app or website directly
-            open_app(cmd, app_map)
+
+    if RECOGNITION_MODE == "vosk":
+        run_streaming()
+    else:
+        run_google()
+
+    # Let "Goodbye." finish before the process exits
+    speech.close(drain=True)
@@ -0,0 +1,191 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+from speech_stream import (
+    EnergyVAD, FRAME_MS, SAMPLE_RATE, VOSK_MODEL_PATH, tracer, wav_frames, wav_sample_rate,
+)
+
+WAKE_PHRASE = os.getenv("VOICE_WAKE_PHRASE", "hey control")
+AWAKE_SECONDS = 6   # how long full recognition stays on after the wake phrase or the last speech
+
+
+class WakeWordSpotter:
+    """
+    Keyword spotting with Vosk restricted to a two-entry grammar (the wake
+    phrase and [unk]). Decoding against that grammar is far cheaper than
+    the full language model, and it only runs on frames the VAD marks as
+    speech, so an idle room costs little more than the RMS of each frame.
+    """
+
+    def __init__(self, model, sample_rate=SAMPLE_RATE, phrase=WAKE_PHRASE, vad=None):
+        from vosk import KaldiRecognizer
+
+        self.phrase = " ".join(phrase.lower().split())
+        self.recognizer = KaldiRecognizer(model, sample_rate, json.dumps([self.phrase, "[unk]"]))
+        self.vad = vad or EnergyVAD(hangover_frames=10)
+        self.frames_decoded = 0
+
+    def feed(self, frame):
+        """Returns True on the frame where the wake phrase is recognized."""
+        event = self.vad.update(frame)
+        if not self.vad.in_speech and event != "end":
+            return False
+
+        self.frames_decoded += 1
+        if self.recognizer.AcceptWaveform(frame):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self.recognizer.PartialResult()).get("partial", "")
+
+        if self.phrase in text:
+            self.recognizer.Reset()
+            return True
+        if event == "end":
+            self.recognizer.Reset()
+        return False
+
+
+class WakeWordGate:
+    """
+    Sits in front of a StreamingRecognizer: audio only reaches full
+    recognition for AWAKE_SECONDS after the wake phrase, extended while
+    the user keeps talking.
+
+    While asleep the recognizer still observes every frame (VAD and
+    pre-roll, no decoding), so on wake it decodes the current utterance
+    from its start: "hey control open chrome" works in one breath.
+    The recognizer resumes before `on_wake` runs: resuming counts as
+    speech starting (barge-in), which would otherwise drop a wake beep
+    that on_wake just queued.
+    """
+
+    def __init__(self, recognizer, spotter, awake_seconds=AWAKE_SECONDS, on_wake=None, on_sleep=None):
+        self.recognizer = recognizer
+        self.spotter = spotter
+        self.awake_frames = int(awake_seconds * 1000 / FRAME_MS)
+        self.on_wake = on_wake
+        self.on_sleep = on_sleep
+        self.awake = False
+        self._remaining = 0
+
+    def feed(self, frame):
+        if not self.awake:
+            self.recognizer.observe(frame)
+            with tracer.span("wake_word", "voice"):
+                woke = self.spotter.feed(frame)
+            if woke:
+                self.awake = True
+                self._remaining = self.awake_frames
+                self.recognizer.resume()
+                if self.on_wake:
+                    self.on_wake()
+            return
+
+        self.recognizer.feed(frame)
+        if self.recognizer.vad.in_speech:
+            self._remaining = self.awake_frames
+        else:
+            self._remaining -= 1
+            if self._remaining <= 0:
+                self.awake = False
+                if self.on_sleep:
+                    self.on_sleep()
+
+    def run(self, frames, stop_event=None):
+        for frame in frames:
+            if stop_event is not None and stop_event.is_set():
+                break
+            self.feed(frame)
+
+
+def strip_wake_phrase(text, phrase=WAKE_PHRASE):
+    """'hey control open chrome' -> 'open chrome'."""
+    phrase = " ".join(phrase.lower().split())
+    text = text.strip()
+    if text.lower().startswith(phrase):
+        return text[len(phrase):].strip()
+    return text
+
+
+# -------------------- Evaluation on recorded WAV sets --------------------
+def count_detections(model, path, phrase):
+    spotter = WakeWordSpotter(model, wav_sample_rate(path), phrase)
+    hits = frames = 0
+    for frame in wav_frames(path):
+        frames += 1
+        if spotter.feed(frame):
+            hits += 1
+    return hits, frames * FRAME_MS / 1000, spotter.frames_decoded
+
+
+def evaluate(model_path, positives, negatives, phrase):
+    from vosk import Model, SetLogLevel
+
+    SetLogLevel(-1)
+    model = Model(model_path)
+    cpu0 = time.process_time()
+    audio_seconds = 0.0
+    decoded = total_frames = 0
+
+    misses = []
+    for path in positives:
+        hits, seconds, dec = count_detections(model, path, phrase)
+        audio_seconds += seconds
+        decoded += dec
+        total_frames += seconds * 1000 / FRAME_MS
+        if hits == 0:
+            misses.append(path)
+
+    false_accepts = 0
+    negative_seconds = 0.0
+    noisy = []
+    for path in negatives:
+        hits, seconds, dec = count_detections(model, path, phrase)
+        audio_seconds += seconds
+        negative_seconds += seconds
+        decoded += dec
+        total_frames += seconds * 1000 / FRAME_MS
+        if hits:
+            false_accepts += hits
+            noisy.append((path, hits))
+    cpu = time.process_time() - cpu0
+
+    print(f'Wake phrase: "{phrase}"')
+    if positives:
+        print(f"False-reject rate: {len(misses)}/{len(positives)} = {len(misses) / len(positives):.1%}")
+        for path in misses:
+            print(f"  missed: {path}")
+    if negatives:
+        per_hour = false_accepts / (negative_seconds / 3600) if negative_seconds else 0.0
+        print(f"False accepts: {false_accepts} in {len(negatives)} files "
+              f"({negative_seconds / 60:.1f} min) = {per_hour:.2f} per hour, "
+              f"{len(noisy) / len(negatives):.1%} of files")
+        for path, hits in noisy:
+            print(f"  false accept x{hits}: {path}")
+    if audio_seconds:
+        print(f"CPU: {cpu:.2f}s for {audio_seconds:.1f}s of audio = {cpu / audio_seconds:.1%} of one core, "
+              f"{decoded / max(1, total_frames):.1%} of frames decoded")
+
+
+def wav_list(paths):
+    out = []
+    for p in paths or []:
+        out.extend(sorted(glob.glob(os.path.join(p, "*.wav"))) if os.path.isdir(p) else [p])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure wake-word false-accept/false-reject rates on WAV sets.")
+    parser.add_argument("--positives", nargs="*", help="WAV files or folders that contain the wake phrase")
+    parser.add_argument("--negatives", nargs="*", help="WAV files or folders without it (office noise, chatter)")
+    parser.add_argument("--phrase", default=WAKE_PHRASE)
+    parser.add_argument("--model", default=VOSK_MODEL_PATH)
+    args = parser.parse_args()
+    evaluate(args.model, wav_list(args.positives), wav_list(args.negatives), args.phrase)
+
+
+if __name__ == "__main__":
+    main()
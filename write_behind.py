@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import deque
+
+
+class WriteBehindQueue:
+    """
+    Collects rows in memory and hands them to `flush_fn` in batches from a
+    background thread, so request threads never wait on the database lock.
+    Rows stay visible through `pending()` until they have been written.
+
+    When a batch fails, its rows are retried one at a time so one bad row
+    cannot hold up the others; a row that still fails after `max_retries`
+    passes is logged and dropped.
+    """
+
+    def __init__(self, flush_fn, batch_size=50, flush_interval=0.2,
+                 max_pending=10000, max_retries=3, name="write-behind"):
+        self.flush_fn = flush_fn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+
+        # Entries are [row, failed attempts]
+        self._items = deque()
+        self._in_flight = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flushed_seq = 0
+        self._queued_seq = 0
+
+        self.batches_written = 0
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, row):
+        """Queue a row for writing. Blocks only if the backlog is full."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            while len(self._items) >= self.max_pending:
+                self._cond.wait(0.05)
+            self._items.append([row, 0])
+            self._queued_seq += 1
+            if len(self._items) >= self.batch_size:
+                self._cond.notify_all()
+
+    def pending(self, predicate=None):
+        """
+        Rows queued or being written that are not committed yet, oldest first.
+
+        Call it before reading the backing store, not after: a row committed
+        in between then shows up in both (drop it from these by its key),
+        whereas reading the store first could miss it entirely.
+        """
+        with self._cond:
+            rows = [entry[0] for entry in self._in_flight] + [entry[0] for entry in self._items]
+        if predicate is None:
+            return rows
+        return [r for r in rows if predicate(r)]
+
+    def flush(self, timeout=None):
+        """Block until every row queued so far has been committed or dropped."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._queued_seq
+            self._cond.notify_all()
+            while self._flushed_seq < target and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.1)
+            return self._flushed_seq >= target
+
+    def close(self, timeout=10):
+        """Durable shutdown: write out everything still queued, then stop the worker."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _take_batch(self):
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(self.flush_interval)
+            # Give a partially filled batch a moment to grow before writing.
+            if 0 < len(self._items) < self.batch_size and not self._closed:
+                self._cond.wait(self.flush_interval)
+            n = min(len(self._items), self.batch_size)
+            self._in_flight = [self._items.popleft() for _ in range(n)]
+            return list(self._in_flight)
+
+    def _write_one_by_one(self, batch):
+        """Retry a failed batch row by row. Returns (rows written, entries to retry later)."""
+        written = 0
+        retry = []
+        for entry in batch:
+            try:
+                self.flush_fn([entry[0]])
+                written += 1
+            except Exception as e:
+                entry[1] += 1
+                if entry[1] >= self.max_retries:
+                    print(f"Write-behind dropping a row after {entry[1]} failed attempts:", e)
+                    self.rows_dropped += 1
+                else:
+                    retry.append(entry)
+        return written, retry
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch:
+                retry = []
+                try:
+                    self.flush_fn([entry[0] for entry in batch])
+                    written = len(batch)
+                except Exception as e:
+                    print("Write-behind flush error:", e)
+                    self.errors += 1
+                    written, retry = self._write_one_by_one(batch)
+
+                with self._cond:
+                    self._in_flight = []
+                    # Rows that may still succeed go back to the front, in their original order
+                    self._items.extendleft(reversed(retry))
+                    self._flushed_seq += len(batch) - len(retry)
+                    if written:
+                        self.batches_written += 1
+                        self.rows_written += written
+                    self._cond.notify_all()
+
+                if retry:
+                    time.sleep(min(1.0, 0.1 * max(entry[1] for entry in retry)))
+                    continue
+
+            with self._cond:
+                if self._closed and not self._items:
+                    self._flushed_seq = self._queued_seq
+                    self._cond.notify_all()
+                    return